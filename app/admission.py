@@ -0,0 +1,142 @@
+"""
+Admission control for the SafeRAG API.
+
+RESPONSIBILITIES:
+- Bound concurrent verifications (max in-flight)
+- Bound waiting work (max queued); overflow is shed immediately
+- Drop requests whose client deadline has already passed
+- Report queue depth and wait time
+
+NOTE:
+- Runs on the event loop (single-threaded); no locks required
+- Slots are handed directly to the oldest waiter on release (FIFO)
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted.
+
+    reason: "overloaded" | "deadline_exceeded"
+    """
+
+    def __init__(self, reason, retry_after=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight=8, max_queued=32, retry_after=1):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        if max_queued < 0:
+            raise ValueError("max_queued must be >= 0")
+
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+        self._waiters = deque()
+
+        self.admitted = 0
+        self.shed = 0
+        self.expired = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    async def acquire(self, deadline=None):
+        """
+        Wait for an execution slot.
+
+        deadline: absolute UNIX time (seconds) after which the client
+                  no longer wants an answer, or None.
+
+        Returns the time spent queued, in milliseconds.
+        """
+        if deadline is not None and deadline <= time.time():
+            self.expired += 1
+            raise AdmissionRejected("deadline_exceeded")
+
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._record_admit(0.0)
+            return 0.0
+
+        if len(self._waiters) >= self.max_queued:
+            self.shed += 1
+            raise AdmissionRejected("overloaded", retry_after=self.retry_after)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        queued_at = time.perf_counter()
+
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time.time(), 0.0)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over as we gave up: pass it on
+                self.release()
+            else:
+                fut.cancel()
+                self._waiters.remove(fut)
+
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.expired += 1
+            raise AdmissionRejected("deadline_exceeded")
+
+        waited_ms = (time.perf_counter() - queued_at) * 1000
+        self._record_admit(waited_ms)
+        return waited_ms
+
+    def release(self):
+        """
+        Free a slot, handing it to the oldest live waiter if any.
+        """
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _record_admit(self, waited_ms):
+        self.admitted += 1
+        self.total_wait_ms += waited_ms
+        self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def stats(self):
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "expired": self.expired,
+            "avg_wait_ms": round(self.total_wait_ms / max(self.admitted, 1), 3),
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+def controller_from_env():
+    return AdmissionController(
+        max_in_flight=int(os.environ.get("SAFERAG_MAX_IN_FLIGHT", 8)),
+        max_queued=int(os.environ.get("SAFERAG_MAX_QUEUED", 32)),
+        retry_after=int(os.environ.get("SAFERAG_RETRY_AFTER_S", 1)),
+    )
@@ -1,8 +1,58 @@
-from fastapi import FastAPI, HTTPException
-from app.schemas import SafeRAGRequest, SafeRAGResponse
-from app.service import run_saferag
+import hmac
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
 
-app = FastAPI(title="SafeRAG Verification Service")
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.admission import AdmissionRejected, controller_from_env
+from app.profiling import profiler_from_env
+from app.schemas import ProfilingSettings, SafeRAGRequest, SafeRAGResponse
+from app.service import quality_stats, run_saferag
+from core.telemetry import Gauge, render_prometheus
+from saferag_bootstrap import warmup
+
+# --------------------------------------------------
+# Startup warmup (index + model) and readiness
+# --------------------------------------------------
+
+readiness = {"status": "starting"}
+
+
+def _warmup():
+    t0 = time.perf_counter()
+    try:
+        readiness.update(warmup())
+        readiness["status"] = "ready"
+    except Exception as e:
+        readiness.update(status="failed", error=str(e))
+    readiness["warmup_s"] = round(time.perf_counter() - t0, 3)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm up in the background so the server accepts connections
+    # immediately; /ready reports healthy once it has finished.
+    if os.environ.get("SAFERAG_WARMUP", "1") == "1":
+        threading.Thread(target=_warmup, name="saferag-warmup", daemon=True).start()
+    else:
+        readiness["status"] = "ready"
+    yield
+
+
+app = FastAPI(title="SafeRAG Verification Service", lifespan=lifespan)
+
+admission = controller_from_env()
+profiler = profiler_from_env()
+
+ADMISSION_GAUGES = {
+    field: Gauge(f"saferag_admission_{field}", f"Admission controller {field}.")
+    for field in admission.stats()
+}
 
 
 @app.get("/")
@@ -14,9 +64,120 @@ def root():
     }
 
 
+@app.get("/ready")
+def ready():
+    return JSONResponse(
+        dict(readiness),
+        status_code=200 if readiness["status"] == "ready" else 503,
+    )
+
+
+@app.get("/admission")
+def admission_stats():
+    return admission.stats()
+
+
+@app.get("/stats")
+def stats(profile: Optional[str] = None, domain: Optional[str] = None):
+    # Rolling (window_s) and lifetime quality / decision statistics
+    return quality_stats.snapshot(profile=profile, domain=domain)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    for field, value in admission.stats().items():
+        ADMISSION_GAUGES[field].set(value)
+    return PlainTextResponse(
+        render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+# --------------------------------------------------
+# Admin: profiling
+# --------------------------------------------------
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    # Admin endpoints are disabled unless SAFERAG_ADMIN_TOKEN is set
+    expected = os.environ.get("SAFERAG_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled.")
+    if not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+def profiling_status():
+    return profiler.stats()
+
+
+@app.post("/admin/profiling", dependencies=[Depends(require_admin)])
+def profiling_update(settings: ProfilingSettings):
+    if settings.enabled is not None:
+        profiler.enabled = settings.enabled
+    if settings.sample_rate is not None:
+        if not 0.0 <= settings.sample_rate <= 1.0:
+            raise HTTPException(status_code=422, detail="sample_rate must be in [0, 1].")
+        profiler.sample_rate = settings.sample_rate
+    return profiler.stats()
+
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def profiles_list():
+    return profiler.list_profiles()
+
+
+@app.get("/admin/profiles/{name}", dependencies=[Depends(require_admin)])
+def profiles_download(name: str):
+    path = profiler.resolve(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return FileResponse(path, filename=name)
+
+
+# --------------------------------------------------
+# Verification
+# --------------------------------------------------
+
 @app.post("/verify", response_model=SafeRAGResponse)
-def verify(req: SafeRAGRequest):
-    decision, claims, metrics = run_saferag(req)
+async def verify(
+    req: SafeRAGRequest,
+    response: Response,
+    x_request_deadline: Optional[float] = Header(default=None),
+    x_saferag_profile: Optional[str] = Header(default=None),
+):
+    # X-Request-Deadline: absolute UNIX time (seconds)
+    try:
+        waited_ms = await admission.acquire(deadline=x_request_deadline)
+    except AdmissionRejected as e:
+        if e.reason == "overloaded":
+            raise HTTPException(
+                status_code=503,
+                detail="SafeRAG overloaded. Retry later.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        raise HTTPException(
+            status_code=504,
+            detail="Client deadline exceeded before verification started."
+        )
+
+    profile = (
+        profiler.wants(requested=x_saferag_profile == "1")
+        and profiler.try_acquire()
+    )
+
+    try:
+        if profile:
+            (decision, claims, metrics), profile_name = await run_in_threadpool(
+                profiler.run, run_saferag, req, tag=req.request_id
+            )
+            response.headers["X-Profile-Name"] = profile_name
+        else:
+            decision, claims, metrics = await run_in_threadpool(run_saferag, req)
+    finally:
+        admission.release()
+
+    response.headers["X-Queue-Wait-Ms"] = f"{waited_ms:.3f}"
 
     if decision == "ERROR":
         raise HTTPException(
@@ -4,12 +4,27 @@ from pathlib import Path
 
 LOG_PATH = Path("logs/saferag_audit.jsonl")
 
+_ENABLED = True
+
+
+def set_audit_enabled(enabled: bool):
+    """
+    Enable / disable audit logging process-wide (e.g. bulk evaluation).
+    Returns the previous setting.
+    """
+    global _ENABLED
+    previous, _ENABLED = _ENABLED, enabled
+    return previous
+
 
 def log_audit_event(payload: dict):
     """
     Append a single audit event as JSONL.
     Must NEVER crash the main system.
     """
+    if not _ENABLED:
+        return
+
     try:
         payload["timestamp"] = time.time()
 
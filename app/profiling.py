@@ -0,0 +1,231 @@
+"""
+Opt-in per-request profiling for the SafeRAG API.
+
+RESPONSIBILITIES:
+- Decide whether a request is profiled (header, admin toggle, sampling)
+- Rate-limit profiling so it cannot degrade other traffic
+- Wrap run_saferag in a profiler and write one file per request,
+  tagged with the audit_id
+
+OUTPUT:
+- cProfile:     <audit_id>.prof        (pstats / snakeviz)
+- pyinstrument: <audit_id>.collapsed   (flamegraph.pl / speedscope),
+                used when pyinstrument is installed
+
+NOTE:
+- At most one request is profiled at a time
+- Only the newest `keep` profiles are retained on disk
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+PROFILE_DIR = Path("logs/profiles")
+PROFILE_SUFFIXES = (".prof", ".collapsed")
+
+
+def _sampling_profiler():
+    try:
+        import pyinstrument
+    except ImportError:
+        return None
+    return pyinstrument
+
+
+def _collapse(frame, prefix, out):
+    """
+    Flatten a pyinstrument frame tree into collapsed-stack lines.
+    """
+    name = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    path = f"{prefix};{name}" if prefix else name
+
+    self_time = frame.time
+    for child in frame.children:
+        if child.is_synthetic:
+            continue
+        self_time -= child.time
+        _collapse(child, path, out)
+
+    micros = int(round(self_time * 1e6))
+    if micros > 0:
+        out.append(f"{path} {micros}")
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        enabled=False,
+        sample_rate=0.0,
+        max_per_minute=6,
+        keep=50,
+        output_dir=PROFILE_DIR,
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.keep = keep
+        self.output_dir = Path(output_dir)
+
+        self._lock = threading.Lock()
+        self._active = False
+        self._tokens = float(max_per_minute)
+        self._refilled_at = time.monotonic()
+
+        self.profiled = 0
+        self.throttled = 0
+
+    # -------------------------
+    # Admission
+    # -------------------------
+
+    def wants(self, requested=False):
+        """
+        True if this request asks to be profiled (header, toggle or sample).
+        """
+        if requested or self.enabled:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def try_acquire(self):
+        """
+        Take a profiling slot; False if rate-limited or already profiling.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.max_per_minute),
+                self._tokens + (now - self._refilled_at) * self.max_per_minute / 60.0,
+            )
+            self._refilled_at = now
+
+            if self._active or self._tokens < 1:
+                self.throttled += 1
+                return False
+
+            self._tokens -= 1
+            self._active = True
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._active = False
+
+    # -------------------------
+    # Execution
+    # -------------------------
+
+    def run(self, fn, *args, tag):
+        """
+        Call fn(*args) under a profiler (slot must already be acquired).
+
+        Returns (result, profile_name).
+        """
+        try:
+            sampler = _sampling_profiler()
+            if sampler is not None:
+                result, lines = self._run_sampling(sampler, fn, args)
+                name = self._write(tag, ".collapsed", "\n".join(lines) + "\n")
+            else:
+                result, stats_path = self._run_cprofile(fn, args, tag)
+                name = stats_path.name
+            self.profiled += 1
+        finally:
+            self._release()
+
+        self._prune()
+        return result, name
+
+    def _run_sampling(self, sampler, fn, args):
+        profiler = sampler.Profiler(interval=0.0005)
+        profiler.start()
+        try:
+            result = fn(*args)
+        finally:
+            profiler.stop()
+
+        lines = []
+        root = profiler.last_session.root_frame()
+        if root is not None:
+            _collapse(root, "", lines)
+        return result, lines
+
+    def _run_cprofile(self, fn, args, tag):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(fn, *args)
+        finally:
+            path = self._path(tag, ".prof")
+            profiler.dump_stats(str(path))
+        return result, path
+
+    # -------------------------
+    # Storage
+    # -------------------------
+
+    def _path(self, tag, suffix):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", str(tag))[:100]
+        return self.output_dir / f"{int(time.time() * 1000)}_{safe}{suffix}"
+
+    def _write(self, tag, suffix, text):
+        path = self._path(tag, suffix)
+        path.write_text(text)
+        return path.name
+
+    def list_profiles(self):
+        if not self.output_dir.exists():
+            return []
+        files = [
+            p for p in self.output_dir.iterdir()
+            if p.suffix in PROFILE_SUFFIXES
+        ]
+        files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        return [
+            {
+                "name": p.name,
+                "bytes": p.stat().st_size,
+                "created": p.stat().st_mtime,
+            }
+            for p in files
+        ]
+
+    def resolve(self, name):
+        """
+        Path of a stored profile, or None (never escapes output_dir).
+        """
+        if Path(name).name != name or Path(name).suffix not in PROFILE_SUFFIXES:
+            return None
+        path = self.output_dir / name
+        return path if path.is_file() else None
+
+    def _prune(self):
+        for entry in self.list_profiles()[self.keep:]:
+            try:
+                (self.output_dir / entry["name"]).unlink()
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "max_per_minute": self.max_per_minute,
+            "profiled": self.profiled,
+            "throttled": self.throttled,
+            "sampling_profiler": _sampling_profiler() is not None,
+        }
+
+
+def profiler_from_env():
+    return RequestProfiler(
+        enabled=os.environ.get("SAFERAG_PROFILE") == "1",
+        sample_rate=float(os.environ.get("SAFERAG_PROFILE_SAMPLE_RATE", 0.0)),
+        max_per_minute=int(os.environ.get("SAFERAG_PROFILE_MAX_PER_MIN", 6)),
+        keep=int(os.environ.get("SAFERAG_PROFILE_KEEP", 50)),
+    )
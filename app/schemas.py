@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Dict
+from pydantic import BaseModel, field_validator
+from typing import List, Dict, Literal, Optional
 from enum import Enum
 
 
@@ -9,11 +9,30 @@ class Decision(str, Enum):
     REFUSE = "REFUSE"
 
 
+class EvidencePassage(BaseModel):
+    id: str
+    text: str
+
+    @field_validator("text")
+    @classmethod
+    def text_not_blank(cls, v):
+        # "" is a substring of every claim; a blank passage would verify anything
+        v = v.strip()
+        if not v:
+            raise ValueError("evidence text must not be blank")
+        return v
+
+
 class SafeRAGRequest(BaseModel):
     request_id: str
     generated_text: str
     domain: str = "default"
     policy_profile: str = "default"
+    latency_budget_ms: Optional[float] = None
+    # Passages given to the generator; verified against instead of
+    # ("request") or together with ("merge") the global corpus
+    evidence: Optional[List[EvidencePassage]] = None
+    evidence_mode: Optional[Literal["request", "merge"]] = None
 
 
 class ClaimResult(BaseModel):
@@ -21,6 +40,8 @@ class ClaimResult(BaseModel):
     label: str
     score: float
     evidence_ids: List[str]
+    tier: str = "full"
+    span: Optional[List[int]] = None
 
 
 class SafeRAGResponse(BaseModel):
@@ -28,3 +49,8 @@ class SafeRAGResponse(BaseModel):
     claims: List[ClaimResult]
     metrics: Dict[str, float]
     audit_id: str
+
+
+class ProfilingSettings(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None
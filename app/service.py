@@ -7,19 +7,43 @@ RESPONSIBILITIES:
 - Aggregate claim truth states
 - Apply policy to reach system decision
 - Emit metrics and audit logs
+- Time each pipeline stage (core.telemetry)
 
 NOTE:
 - Verifier returns ONLY truth labels
 - ACCEPT is allowed ONLY if all claims are VERIFIED
 - Any REFUTED claim blocks ACCEPT (global safety rule)
+- Under a latency budget, claims may be verified by a cheaper tier;
+  every claim reports the tier that produced its verdict
+- Request-supplied evidence is indexed per request (EphemeralIndex) and
+  used instead of, or merged with, the global corpus
+- Every request updates the rolling quality statistics (core.stats)
+  for its policy profile and domain
 """
 
+import time
+
 from saferag_bootstrap import bootstrap
-from core.claims import extract_claims
-from core.retriever import retrieve_evidence
+from core.claims import iter_claims
+from core.retriever import EphemeralIndex, merge_evidence, retrieve_evidence
+from core.semantic import EmbeddingError, expected_pair_cost_ms
+from core.stats import stats_from_env
 from core.verifier import classify_claim
 from app.audit import log_audit_event
 from core.policy import load_policy
+from core.telemetry import (
+    CLAIMS_PER_REQUEST,
+    DECISIONS,
+    DEGRADED_CLAIMS,
+    ERRORS,
+    EVIDENCE_PER_CLAIM,
+    current_request_timings,
+    span,
+    start_request_timings,
+    stop_request_timings,
+)
+
+quality_stats = stats_from_env()
 
 
 # --------------------------------------------------
@@ -55,10 +79,131 @@ def cluster_claims(claim_results, threshold=0.5):
     return clusters
 
 
+# --------------------------------------------------
+# Deadline-aware tier selection
+# --------------------------------------------------
+
+def select_tier(remaining_ms, full_cost_ms, top_k):
+    """
+    Pick the most accurate tier expected to finish within the budget.
+
+    remaining_ms: budget left (None = unbounded)
+    full_cost_ms: expected cost of a full-tier claim (None = unknown);
+                  observed in this request, else seeded from warmup
+
+    Full-tier scoring never starts when the budget left is below its
+    expected cost.
+    """
+    if remaining_ms is None:
+        return "full"
+    if remaining_ms <= 0:
+        return "lexical"
+    if full_cost_ms is None or full_cost_ms <= remaining_ms:
+        return "full"
+    if full_cost_ms / max(top_k, 1) <= remaining_ms:
+        return "reduced"
+    return "lexical"
+
+
+# --------------------------------------------------
+# Evidence sources
+# --------------------------------------------------
+
+def corpus_evidence(claim, top_k):
+    """
+    Global corpus retrieval; ids are the stable ingestion passage ids,
+    or "corpus:<index>" for an in-memory index.
+    """
+    return [
+        {**ev, "doc_id": ev.get("passage_id") or f"corpus:{ev['doc_id']}"}
+        for ev in retrieve_evidence(claim, top_k=top_k)
+    ]
+
+
+def evidence_source(request, policy):
+    """
+    Return retrieve(claim, top_k) for this request.
+    """
+    if not request.evidence:
+        return corpus_evidence
+
+    mode = request.evidence_mode or policy.get("request_evidence_mode", "request")
+    if mode not in ("request", "merge"):
+        raise ValueError(f"Unknown evidence mode: {mode}")
+
+    with span("index_request_evidence"):
+        index = EphemeralIndex((p.id, p.text) for p in request.evidence)
+
+    if mode == "request":
+        return index.retrieve
+
+    def merged(claim, top_k):
+        return merge_evidence(
+            [index.retrieve(claim, top_k), corpus_evidence(claim, top_k)],
+            top_k=top_k,
+        )
+
+    return merged
+
+
+def verify_claim(claim, top_k, tier="full", thresholds=None, backend=None, retrieve=None):
+    """
+    Retrieve evidence and aggregate per-passage verdicts for one claim.
+
+    thresholds: optional {"semantic_threshold", "lexical_threshold"}
+    backend: embedding backend name; None = default
+    retrieve: evidence source (see evidence_source); None = global corpus
+
+    The returned verdict carries the ids of the passages consulted.
+    """
+    with span("retrieve_evidence"):
+        evidences = (retrieve or corpus_evidence)(
+            claim,
+            1 if tier == "reduced" else top_k,
+        )
+    EVIDENCE_PER_CLAIM.observe(len(evidences))
+
+    verdicts = [
+        classify_claim(claim, ev["text"], tier=tier, backend=backend, **(thresholds or {}))
+        for ev in evidences
+    ]
+
+    labels = [v["label"] for v in verdicts]
+
+    # Claim-level priority (strict, deterministic)
+    if "REFUTED" in labels:
+        final = next(v for v in verdicts if v["label"] == "REFUTED")
+    elif "VERIFIED" in labels:
+        final = next(v for v in verdicts if v["label"] == "VERIFIED")
+    elif "RISKY_ABSOLUTE" in labels:
+        final = next(v for v in verdicts if v["label"] == "RISKY_ABSOLUTE")
+    else:
+        final = verdicts[0]  # UNSUPPORTED
+
+    final["evidence_ids"] = [str(ev["doc_id"]) for ev in evidences]
+    return final
+
+
 # --------------------------------------------------
 # Main execution
 # --------------------------------------------------
 
+def _audit(payload, policy=None):
+    if policy and policy.get("audit_stage_timings"):
+        payload["stage_timings_ms"] = current_request_timings()
+    with span("log_audit_event"):
+        log_audit_event(payload)
+
+
+def _record(request, decision, verdicts=()):
+    quality_stats.record(
+        decision,
+        verdicts,
+        profile=request.policy_profile,
+        domain=request.domain,
+    )
+
+
 def run_saferag(request):
     """
     Execute SafeRAG end-to-end.
@@ -69,6 +214,19 @@ def run_saferag(request):
         metrics: dict
     """
 
+    token = start_request_timings()
+    try:
+        with span("total"):
+            decision, claim_results, metrics = _run_saferag(request)
+    finally:
+        stop_request_timings(token)
+
+    DECISIONS.inc(decision=decision)
+    return decision, claim_results, metrics
+
+
+def _run_saferag(request):
+    started = time.perf_counter()
     bootstrap()
 
     try:
@@ -77,61 +235,96 @@ def run_saferag(request):
         # --------------------------------------------------
         # Claim extraction
         # --------------------------------------------------
-        claims = extract_claims(
-            request.generated_text,
-            mode=policy.get("claim_extraction_mode", "strict"),
-            max_claims=policy.get("max_claims", 10),
-        )
+        with span("extract_claims"):
+            claims = list(iter_claims(
+                request.generated_text,
+                mode=policy.get("claim_extraction_mode", "strict"),
+                max_claims=policy.get("max_claims", 10),
+            ))
+        CLAIMS_PER_REQUEST.observe(len(claims))
 
         if not claims:
             decision = policy.get("on_insufficient", "REFUSE")
-            log_audit_event({
+            _audit({
                 "audit_id": request.request_id,
                 "decision": decision,
                 "claims": [],
-            })
+            }, policy)
+            _record(request, decision)
             return decision, [], {}
 
         # --------------------------------------------------
         # Claim verification
         # --------------------------------------------------
-        claim_results = []
+        top_k = policy.get("max_evidence_per_claim", 3)
+        thresholds = {
+            "semantic_threshold": policy.get("semantic_threshold", 0.65),
+            "lexical_threshold": policy.get("lexical_threshold", 0.35),
+        }
+        backend = policy.get("embedding_backend")
+        retrieve = evidence_source(request, policy)
+
+        budget_ms = request.latency_budget_ms
+        if budget_ms is None:
+            budget_ms = policy.get("latency_budget_ms")
 
-        for claim in claims:
-            evidences = retrieve_evidence(
-                claim,
-                top_k=policy.get("max_evidence_per_claim", 3),
-            )
-
-            verdicts = [
-                classify_claim(claim, ev["text"])
-                for ev in evidences
-            ]
-
-            labels = [v["label"] for v in verdicts]
-
-            # Claim-level priority (strict, deterministic)
-            if "REFUTED" in labels:
-                final = next(v for v in verdicts if v["label"] == "REFUTED")
-            elif "VERIFIED" in labels:
-                final = next(v for v in verdicts if v["label"] == "VERIFIED")
-            elif "RISKY_ABSOLUTE" in labels:
-                final = next(v for v in verdicts if v["label"] == "RISKY_ABSOLUTE")
+        claim_results = []
+        verdicts = []
+        degradations = []
+        full_costs = []
+
+        for extracted in claims:
+            claim = extracted["text"]
+            remaining_ms = None
+            if budget_ms is not None:
+                remaining_ms = budget_ms - (time.perf_counter() - started) * 1000
+
+            if full_costs:
+                full_cost_ms = sum(full_costs) / len(full_costs)
+            else:
+                # First claim: estimate from warmup / earlier requests
+                pair_ms = expected_pair_cost_ms(backend)
+                full_cost_ms = pair_ms * top_k if pair_ms is not None else None
+
+            tier = select_tier(remaining_ms, full_cost_ms, top_k)
+            reason = "deadline" if tier != "full" else None
+
+            claim_started = time.perf_counter()
+            try:
+                final = verify_claim(claim, top_k, tier, thresholds, backend, retrieve)
+            except EmbeddingError:
+                # Embedding failure: degrade explicitly, never silently
+                tier, reason = "lexical", "embedding_error"
+                final = verify_claim(claim, top_k, tier, thresholds, backend, retrieve)
+
+            if tier == "full":
+                full_costs.append((time.perf_counter() - claim_started) * 1000)
             else:
-                final = verdicts[0]  # UNSUPPORTED
+                degradations.append({
+                    "claim": claim,
+                    "tier": tier,
+                    "reason": reason,
+                })
+                DEGRADED_CLAIMS.inc(tier=tier, reason=reason)
+
+            verdicts.append(final)
 
             # IMPORTANT: schema-aligned output
             claim_results.append({
                 "claim": claim,
                 "label": final["label"],
                 "score": final["semantic_score"],   # required by API schema
-                "evidence_ids": [],                 # deterministic placeholder
+                "evidence_ids": final["evidence_ids"],
+                "tier": tier,
+                # Character offsets of the claim in generated_text
+                "span": [extracted["start"], extracted["end"]],
             })
 
         # --------------------------------------------------
         # Metrics (dominant cluster — reporting only)
         # --------------------------------------------------
-        clusters = cluster_claims(claim_results)
+        with span("cluster_claims"):
+            clusters = cluster_claims(claim_results)
         dominant_cluster = clusters[0]
 
         dominant_labels = [c["label"] for c in dominant_cluster]
@@ -142,6 +335,7 @@ def run_saferag(request):
         metrics = {
             "support_rate": round(verified / max(total, 1), 3),
             "contradiction_rate": round(refuted / max(total, 1), 3),
+            "degraded_claims": len(degradations),
         }
 
         # --------------------------------------------------
@@ -162,21 +356,26 @@ def run_saferag(request):
             decision = policy.get("on_insufficient", "REFUSE")
 
     except Exception as e:
-        log_audit_event({
+        ERRORS.inc()
+        _audit({
             "audit_id": request.request_id,
             "decision": "ERROR",
             "error": str(e),
         })
+        _record(request, "ERROR")
         return "ERROR", [], {}
 
     # --------------------------------------------------
     # Audit log
     # --------------------------------------------------
-    log_audit_event({
+    _audit({
         "audit_id": request.request_id,
         "decision": decision,
         "claims": claim_results,
         "metrics": metrics,
-    })
+        "latency_budget_ms": budget_ms,
+        "degradations": degradations,
+    }, policy)
+    _record(request, decision, verdicts)
 
     return decision, claim_results, metrics
@@ -0,0 +1,120 @@
+"""
+SafeRAG cold-start measurements.
+
+Each measurement runs in a fresh interpreter:
+- import time of core.semantic, app.service and app.api
+- time-to-first-verdict: process start -> first run_saferag result,
+  cold (model / index loaded inside the first request) and after an
+  explicit warmup() (as done at API startup)
+
+Usage:
+    python bench/cold_start.py
+    python bench/cold_start.py --repeat 5 --output bench/results/cold_start.json
+    SAFERAG_NO_EMBEDDINGS=1 python bench/cold_start.py
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_PROBE = """
+import time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+"""
+
+VERDICT_PROBE = """
+import time
+t0 = time.perf_counter()
+from app.service import run_saferag
+from app.schemas import SafeRAGRequest
+from app.audit import set_audit_enabled
+from saferag_bootstrap import warmup
+t_import = time.perf_counter()
+set_audit_enabled(False)
+if {warm}:
+    warmup()
+t_ready = time.perf_counter()
+req = SafeRAGRequest(request_id="cold_start", generated_text="Metformin is the first line treatment for type 2 diabetes.")
+run_saferag(req)
+t_first = time.perf_counter()
+run_saferag(req)
+t_second = time.perf_counter()
+print(t_import - t0, t_ready - t_import, t_first - t_ready, t_second - t_first)
+"""
+
+
+def _probe(code):
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [float(x) * 1000 for x in out.stdout.split()]
+
+
+def _median(samples):
+    return round(statistics.median(samples), 3)
+
+
+def measure_imports(modules, repeat):
+    return {
+        m: {"median_ms": _median([_probe(IMPORT_PROBE.format(module=m))[0] for _ in range(repeat)])}
+        for m in modules
+    }
+
+
+def measure_first_verdict(warm, repeat):
+    runs = [_probe(VERDICT_PROBE.format(warm=warm)) for _ in range(repeat)]
+    imports, ready, first, second = zip(*runs)
+    return {
+        "import_ms": _median(imports),
+        "warmup_ms": _median(ready),
+        "first_verdict_ms": _median(first),
+        "second_verdict_ms": _median(second),
+        # What the first caller waits for after the server is up
+        "first_request_penalty_ms": _median([f - s for f, s in zip(first, second)]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SafeRAG cold-start measurements")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    report = {
+        "imports": measure_imports(["core.semantic", "app.service", "app.api"], args.repeat),
+        "time_to_first_verdict": {
+            "cold": measure_first_verdict(False, args.repeat),
+            "warmed": measure_first_verdict(True, args.repeat),
+        },
+    }
+
+    for m, r in report["imports"].items():
+        print(f"import {m:20s} {r['median_ms']:>10.1f} ms")
+    for mode, r in report["time_to_first_verdict"].items():
+        print(
+            f"{mode:7s} import={r['import_ms']:.1f} ms  warmup={r['warmup_ms']:.1f} ms  "
+            f"first={r['first_verdict_ms']:.1f} ms  second={r['second_verdict_ms']:.1f} ms"
+        )
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2))
+        print("\nResults written to", out)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Closed-loop HTTP load test for the SafeRAG /verify service.
+
+Targets:
+- in-process ASGI transport (default, no network)
+- a running server (--url), or one spawned via run_api.py (--spawn)
+
+Workload:
+- generations replayed from eval/datasets/*.jsonl (default)
+- or synthetic generations (--synthetic N claims)
+
+Reports throughput, p50/p95/p99 latency, error rate and decision mix.
+--sweep runs several concurrency levels and reports the saturation knee.
+
+Runs fully offline: SAFERAG_NO_EMBEDDINGS=1 is set unless --embeddings is
+given. --policy-profile sends requests under a policy profile; with
+--embeddings, "fast" load-tests the offline hashed backend.
+
+Usage:
+    python bench/load_test.py --concurrency 8 --duration 10
+    python bench/load_test.py --sweep 1,2,4,8,16,32 --duration 5
+    python bench/load_test.py --spawn --rate 50 --requests 2000
+    python bench/load_test.py --policy-profile fast --embeddings --concurrency 8
+    python bench/load_test.py --url http://127.0.0.1:8000 --output load.json
+
+Requires httpx.
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from glob import glob
+from pathlib import Path
+from collections import Counter
+
+# --------------------------------------------------
+# Ensure project root is on PYTHONPATH
+# --------------------------------------------------
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+
+# --------------------------------------------------
+# Workload
+# --------------------------------------------------
+def load_generations(patterns):
+    generations = []
+    for pattern in patterns:
+        for path in sorted(glob(pattern)):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        generations.append(json.loads(line)["generation"])
+    if not generations:
+        raise SystemExit(f"No generations found in {patterns}")
+    return generations
+
+
+def synthetic_generations(n_claims, count=64):
+    from bench.synthetic import generate_generation
+    return [generate_generation(n_claims, seed=i) for i in range(count)]
+
+
+# --------------------------------------------------
+# Statistics
+# --------------------------------------------------
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def summarise(latencies_ms, statuses, decisions, elapsed_s):
+    lat = sorted(latencies_ms)
+    total = len(statuses)
+    errors = sum(1 for s in statuses if s != 200)
+    return {
+        "requests": total,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(total / max(elapsed_s, 1e-9), 2),
+        "goodput_rps": round((total - errors) / max(elapsed_s, 1e-9), 2),
+        "p50_ms": round(percentile(lat, 50), 3),
+        "p95_ms": round(percentile(lat, 95), 3),
+        "p99_ms": round(percentile(lat, 99), 3),
+        "max_ms": round(lat[-1], 3) if lat else 0.0,
+        "error_rate": round(errors / max(total, 1), 4),
+        "status_codes": dict(Counter(str(s) for s in statuses)),
+        "decisions": dict(Counter(decisions)),
+    }
+
+
+def find_knee(levels, min_gain=0.05):
+    """
+    Saturation knee: the first concurrency level after which goodput
+    (successful requests/s) improves by less than min_gain (relative).
+    Shed requests (503) are fast and would inflate raw throughput.
+    """
+    for prev, cur in zip(levels, levels[1:]):
+        gain = (cur["goodput_rps"] - prev["goodput_rps"]) / max(prev["goodput_rps"], 1e-9)
+        if gain < min_gain:
+            return prev["concurrency"]
+    return levels[-1]["concurrency"] if levels else None
+
+
+# --------------------------------------------------
+# Load generation
+# --------------------------------------------------
+async def run_level(client, generations, concurrency, duration_s=None, max_requests=None, rate=None,
+                    policy_profile=None):
+    """
+    Closed loop: `concurrency` workers, each sending its next request as
+    soon as the previous one completes. `rate` (req/s) caps the global
+    start rate; `policy_profile` sets the requests' policy profile.
+    """
+    latencies, statuses, decisions = [], [], []
+    counter = {"sent": 0}
+    started = time.perf_counter()
+    deadline = started + duration_s if duration_s else None
+
+    def next_slot():
+        if max_requests is not None and counter["sent"] >= max_requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        i = counter["sent"]
+        counter["sent"] += 1
+        return i
+
+    async def worker():
+        while True:
+            i = next_slot()
+            if i is None:
+                return
+
+            if rate:
+                delay = started + i / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            body = {
+                "request_id": f"load_{concurrency}_{i}",
+                "generated_text": generations[i % len(generations)],
+            }
+            if policy_profile:
+                body["policy_profile"] = policy_profile
+            t0 = time.perf_counter()
+            try:
+                r = await client.post("/verify", json=body)
+                status = r.status_code
+                if status == 200:
+                    decisions.append(r.json()["decision"])
+            except Exception:
+                status = "exception"
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses.append(status)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    result = summarise(latencies, statuses, decisions, time.perf_counter() - started)
+    result["concurrency"] = concurrency
+    return result
+
+
+def make_client(url, timeout):
+    import httpx
+
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=timeout)
+
+    from app.api import app
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://saferag", timeout=timeout)
+
+
+def spawn_server(url, startup_timeout=60):
+    import httpx
+
+    proc = subprocess.Popen([sys.executable, "run_api.py"], cwd=str(ROOT), env=os.environ.copy())
+    t0 = time.time()
+    while time.time() - t0 < startup_timeout:
+        if proc.poll() is not None:
+            raise SystemExit("run_api.py exited during startup")
+        try:
+            if httpx.get(url + "/", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("run_api.py did not become ready")
+
+
+async def run(args, generations):
+    async with make_client(args.url, args.timeout) as client:
+        # Warm up (bootstrap, model load) outside the measurement
+        for g in generations[: args.warmup]:
+            body = {"request_id": "load_warmup", "generated_text": g}
+            if args.policy_profile:
+                body["policy_profile"] = args.policy_profile
+            await client.post("/verify", json=body)
+
+        levels = args.sweep or [args.concurrency]
+        results = []
+        for c in levels:
+            res = await run_level(
+                client,
+                generations,
+                c,
+                duration_s=None if args.requests else args.duration,
+                max_requests=args.requests,
+                rate=args.rate,
+                policy_profile=args.policy_profile,
+            )
+            results.append(res)
+            print(
+                f"c={c:<4d} rps={res['throughput_rps']:<9} good={res['goodput_rps']:<9} p50={res['p50_ms']:<9} "
+                f"p95={res['p95_ms']:<9} p99={res['p99_ms']:<9} err={res['error_rate']:<7} "
+                f"decisions={res['decisions']}"
+            )
+        return results
+
+
+# --------------------------------------------------
+# Main
+# --------------------------------------------------
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SafeRAG /verify load test")
+    parser.add_argument("--url", default=None, help="target server (default: in-process ASGI)")
+    parser.add_argument("--spawn", action="store_true", help="start run_api.py and target it")
+    parser.add_argument("--datasets", default="eval/datasets/*.jsonl")
+    parser.add_argument("--synthetic", type=int, default=None, help="claims per synthetic generation")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sweep", type=_int_list, default=None, help="e.g. 1,2,4,8,16,32")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--requests", type=int, default=None, help="requests per level (overrides --duration)")
+    parser.add_argument("--rate", type=float, default=None, help="max request start rate (req/s)")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--policy-profile", default=None,
+                        help="policy profile for every request (e.g. fast)")
+    parser.add_argument("--embeddings", action="store_true", help="do not force SAFERAG_NO_EMBEDDINGS")
+    parser.add_argument("--output", default=None, help="write JSON report")
+    args = parser.parse_args(argv)
+
+    if not args.embeddings:
+        os.environ["SAFERAG_NO_EMBEDDINGS"] = "1"
+
+    if args.synthetic:
+        generations = synthetic_generations(args.synthetic)
+    else:
+        generations = load_generations([str(ROOT / args.datasets)])
+
+    proc = None
+    if args.spawn:
+        args.url = args.url or "http://127.0.0.1:8000"
+        proc = spawn_server(args.url)
+
+    try:
+        results = asyncio.run(run(args, generations))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    report = {"policy_profile": args.policy_profile, "levels": results}
+    if args.sweep:
+        report["knee_concurrency"] = find_knee(results)
+        print("\nSaturation knee at concurrency:", report["knee_concurrency"])
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print("Report written to", args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+SafeRAG retriever memory benchmark.
+
+Compares resident Python heap (tracemalloc, retained after build) for:
+- legacy    list[str] passages + list[list[str]] tokens + rank_bm25.BM25Okapi
+- in-memory DocumentStore + flat postings arrays (EvidenceRetriever(docs))
+- mmap      the same index saved to disk and memory-mapped (EvidenceRetriever.load)
+
+For the mmap layout the index lives in the OS page cache (shared by all
+worker processes) and is reported as on-disk bytes.
+
+It also reports the peak heap of a streaming ingestion (core.ingest) of
+the same corpus from a text file, which should stay flat as it grows.
+
+Usage:
+    python bench/memory.py
+    python bench/memory.py --sizes 10000,1000000 --output bench/results/memory.json
+"""
+
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# --------------------------------------------------
+# Ensure project root is on PYTHONPATH
+# --------------------------------------------------
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from bench.synthetic import iter_corpus, sample_claims
+from core.ingest import ingest
+from core.retriever import EvidenceRetriever
+
+
+# --------------------------------------------------
+# Measurement
+# --------------------------------------------------
+def traced(build):
+    """
+    Build an object under tracemalloc; return it with retained/peak bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        obj = build()
+        elapsed = time.perf_counter() - t0
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return obj, {
+        "retained_mb": round(retained / 2**20, 2),
+        "peak_mb": round(peak / 2**20, 2),
+        "build_s": round(elapsed, 3),
+    }
+
+
+def _legacy(corpus):
+    from rank_bm25 import BM25Okapi
+
+    documents = list(corpus)
+    tokenized = [doc.lower().split() for doc in documents]
+    return documents, tokenized, BM25Okapi(tokenized)
+
+
+def _disk_bytes(directory):
+    return sum(p.stat().st_size for p in Path(directory).iterdir() if p.is_file())
+
+
+def bench_memory(n, seed=0):
+    corpus = lambda: iter_corpus(n, seed=seed)
+    results = {"passages": n}
+
+    try:
+        legacy, results["legacy"] = traced(lambda: _legacy(corpus()))
+        del legacy
+    except ImportError:
+        results["legacy"] = {"skipped": "rank_bm25 not installed"}
+
+    retriever, results["in_memory"] = traced(lambda: EvidenceRetriever(corpus()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        retriever.save(tmp)
+        del retriever
+
+        loaded, results["mmap"] = traced(lambda: EvidenceRetriever.load(tmp))
+        results["mmap"]["disk_mb"] = round(_disk_bytes(tmp) / 2**20, 2)
+
+        # Touch the index so the numbers reflect a serving retriever
+        for claim in sample_claims(20, seed=seed):
+            loaded.retrieve(claim, top_k=3)
+        del loaded
+
+        source = Path(tmp) / "corpus.txt"
+        with open(source, "w") as f:
+            for passage in corpus():
+                f.write(passage + "\n")
+        _, results["ingest"] = traced(lambda: ingest([source], Path(tmp) / "ingested"))
+
+    return results
+
+
+# --------------------------------------------------
+# Main
+# --------------------------------------------------
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SafeRAG retriever memory benchmark")
+    parser.add_argument("--sizes", type=_int_list, default=[10000, 100000])
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    report = [bench_memory(n) for n in args.sizes]
+
+    for res in report:
+        print(f"passages={res['passages']}")
+        for layout in ("legacy", "in_memory", "mmap", "ingest"):
+            r = res[layout]
+            if "skipped" in r:
+                print(f"  {layout:10s} skipped ({r['skipped']})")
+                continue
+            disk = f"  disk={r['disk_mb']:.1f} MB" if "disk_mb" in r else ""
+            print(
+                f"  {layout:10s} retained={r['retained_mb']:>9.1f} MB  "
+                f"peak={r['peak_mb']:>9.1f} MB  build={r['build_s']:.2f} s{disk}"
+            )
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({"results": report}, indent=2))
+        print("\nResults written to", out)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
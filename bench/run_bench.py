@@ -0,0 +1,344 @@
+"""
+SafeRAG microbenchmarks.
+
+Measures every pipeline stage on deterministic synthetic data:
+- extract_claims           (1 .. 200 claims; 10k .. 100k-character generations)
+- EvidenceRetriever build  (1k .. 1M passages)
+- EvidenceRetriever retrieve (MaxScore top-k vs exhaustive on rare-entity claims)
+- EphemeralIndex build / retrieve (request-supplied evidence, 5 .. 20 passages)
+- classify_claim           (SAFERAG_NO_EMBEDDINGS on / off)
+- cluster_claims
+- run_saferag              (end-to-end; max_claims raised so every claim is verified)
+
+Usage:
+    python bench/run_bench.py
+    python bench/run_bench.py --sizes 1000,100000 --claims 1,50,200
+    python bench/run_bench.py --output bench/results/new.json \
+        --baseline bench/results/base.json --tolerance 0.25
+
+Exit code 1 when --baseline is given and any benchmark regressed.
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import argparse
+import platform
+import statistics
+from pathlib import Path
+
+# --------------------------------------------------
+# Ensure project root is on PYTHONPATH
+# --------------------------------------------------
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import saferag_bootstrap
+from bench.synthetic import (
+    generate_corpus, generate_generation, long_generation, rare_entity_claims, sample_claims,
+)
+from core.claims import extract_claims, extract_claims_batch, iter_claims
+from core.retriever import EphemeralIndex, EvidenceRetriever, initialize_retriever
+from core.verifier import classify_claim
+from app.audit import set_audit_enabled
+import app.service
+from app.service import cluster_claims, run_saferag
+from app.schemas import SafeRAGRequest
+
+
+# --------------------------------------------------
+# Timing
+# --------------------------------------------------
+def measure(fn, repeat=5, number=1, warmup=1):
+    """
+    Time fn() and summarise per-call latency in milliseconds.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - t0) * 1000 / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(samples[0], 4),
+        "max_ms": round(samples[-1], 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+# --------------------------------------------------
+# Benchmarks
+# --------------------------------------------------
+def bench_extract_claims(claim_counts, repeat):
+    results = {}
+    for n in claim_counts:
+        text = generate_generation(n)
+        results[f"extract_claims/claims={n}"] = measure(
+            lambda: extract_claims(text, max_claims=n), repeat=repeat
+        )
+    return results
+
+
+def bench_extract_long(char_counts, repeat):
+    results = {}
+    for n in char_counts:
+        text = long_generation(n)
+        # Policy default (first 10 claims) stops early; "all" scans the whole text
+        results[f"extract_claims/chars={n}/max_claims=10"] = measure(
+            lambda: extract_claims(text, max_claims=10), repeat=repeat
+        )
+        results[f"extract_claims/chars={n}/all"] = measure(
+            lambda: sum(1 for _ in iter_claims(text)), repeat=repeat
+        )
+
+    texts = [long_generation(10000, seed=i) for i in range(20)]
+    results["extract_claims_batch/texts=20/chars=10000"] = measure(
+        lambda: extract_claims_batch(texts, max_claims=None), repeat=repeat
+    )
+    return results
+
+
+def bench_retriever(sizes, repeat):
+    results = {}
+    queries = sample_claims(20, seed=7)
+    entity_passages, entity_queries = rare_entity_claims()
+
+    for n in sizes:
+        corpus = generate_corpus(n) + entity_passages
+
+        results[f"retriever_build/passages={n}"] = measure(
+            lambda: EvidenceRetriever(corpus), repeat=max(1, repeat // 2), warmup=0
+        )
+
+        retriever = EvidenceRetriever(corpus)
+        it = iter(range(10**12))
+        results[f"retriever_retrieve/passages={n}"] = measure(
+            lambda: retriever.retrieve(queries[next(it) % len(queries)], top_k=3),
+            repeat=repeat,
+        )
+
+        # Rare entity + common terms: MaxScore vs exhaustive scoring
+        for mode, exhaustive in (("maxscore", False), ("exhaustive", True)):
+            it = iter(range(10**12))
+            results[f"retriever_rare_entity/{mode}/passages={n}"] = measure(
+                lambda: retriever.retrieve(
+                    entity_queries[next(it) % len(entity_queries)], top_k=3, exhaustive=exhaustive
+                ),
+                repeat=repeat,
+            )
+        del retriever, corpus
+        gc.collect()
+
+    return results
+
+
+def bench_ephemeral(repeat):
+    results = {}
+    claim = sample_claims(1, seed=5)[0]
+
+    for n in (5, 20):
+        passages = [(f"p{i}", text) for i, text in enumerate(generate_corpus(n, seed=13))]
+
+        results[f"ephemeral_build/passages={n}"] = measure(
+            lambda: EphemeralIndex(passages), repeat=repeat, number=1000
+        )
+        index = EphemeralIndex(passages)
+        results[f"ephemeral_retrieve/passages={n}"] = measure(
+            lambda: index.retrieve(claim, top_k=3), repeat=repeat, number=1000
+        )
+
+    return results
+
+
+def bench_classify(repeat):
+    results = {}
+    claims = sample_claims(20, seed=3)
+    evidence = generate_corpus(20, seed=11)
+    pairs = list(zip(claims, evidence))
+
+    def run():
+        for c, e in pairs:
+            classify_claim(c, e)
+
+    previous = os.environ.get("SAFERAG_NO_EMBEDDINGS")
+    try:
+        for flag, name in (("1", "no_embeddings"), ("0", "embeddings")):
+            os.environ["SAFERAG_NO_EMBEDDINGS"] = flag
+            key = f"classify_claim/{name}/pairs={len(pairs)}"
+            try:
+                classify_claim(*pairs[0])
+            except Exception as e:
+                results[key] = {"skipped": f"{type(e).__name__}: {e}"}
+                continue
+            results[key] = measure(run, repeat=repeat)
+    finally:
+        if previous is None:
+            os.environ.pop("SAFERAG_NO_EMBEDDINGS", None)
+        else:
+            os.environ["SAFERAG_NO_EMBEDDINGS"] = previous
+
+    return results
+
+
+def bench_cluster(claim_counts, repeat):
+    results = {}
+    for n in claim_counts:
+        claim_results = [
+            {"claim": c, "label": "VERIFIED"} for c in sample_claims(n)
+        ]
+        results[f"cluster_claims/claims={n}"] = measure(
+            lambda: cluster_claims(claim_results), repeat=repeat
+        )
+    return results
+
+
+def bench_end_to_end(sizes, claim_counts, repeat):
+    results = {}
+    previous = os.environ.get("SAFERAG_NO_EMBEDDINGS")
+    os.environ["SAFERAG_NO_EMBEDDINGS"] = "1"
+    # Time the pipeline, not audit-log file I/O
+    previous_audit = set_audit_enabled(False)
+    load_policy = app.service.load_policy
+
+    try:
+        for n in sizes:
+            # Replace the global corpus with the synthetic one
+            initialize_retriever(generate_corpus(n))
+            saferag_bootstrap._BOOTSTRAPPED = True
+
+            for c in claim_counts:
+                # The default policy stops at max_claims (10); verify all c
+                app.service.load_policy = (
+                    lambda profile="default", c=c: {**load_policy(profile), "max_claims": c}
+                )
+                req = SafeRAGRequest(
+                    request_id=f"bench_{n}_{c}",
+                    generated_text=generate_generation(c),
+                )
+                _, claims, _ = run_saferag(req)
+                if len(claims) != c:
+                    raise RuntimeError(f"run_saferag verified {len(claims)} of {c} claims")
+
+                results[f"run_saferag/passages={n}/claims={c}"] = measure(
+                    lambda: run_saferag(req), repeat=repeat
+                )
+    finally:
+        app.service.load_policy = load_policy
+        set_audit_enabled(previous_audit)
+        saferag_bootstrap._BOOTSTRAPPED = False
+        if previous is None:
+            os.environ.pop("SAFERAG_NO_EMBEDDINGS", None)
+        else:
+            os.environ["SAFERAG_NO_EMBEDDINGS"] = previous
+
+    return results
+
+
+# --------------------------------------------------
+# Baseline comparison
+# --------------------------------------------------
+def compare(current, baseline, tolerance):
+    """
+    Return benchmarks whose median slowed down by more than tolerance.
+    """
+    regressions = {}
+    for name, res in current.items():
+        base = baseline.get(name)
+        if not base or "median_ms" not in base or "median_ms" not in res:
+            continue
+        ratio = res["median_ms"] / max(base["median_ms"], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions[name] = {
+                "baseline_ms": base["median_ms"],
+                "current_ms": res["median_ms"],
+                "ratio": round(ratio, 3),
+            }
+    return regressions
+
+
+# --------------------------------------------------
+# Main
+# --------------------------------------------------
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SafeRAG microbenchmarks")
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000],
+                        help="corpus sizes (passages), e.g. 1000,100000,1000000")
+    parser.add_argument("--claims", type=_int_list, default=[1, 10, 50, 200],
+                        help="claims per generation")
+    parser.add_argument("--chars", type=_int_list, default=[10000, 100000],
+                        help="characters per long-form generation")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench/results/latest.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed median slowdown vs baseline (0.2 = +20%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    results.update(bench_extract_claims(args.claims, args.repeat))
+    results.update(bench_extract_long(args.chars, args.repeat))
+    results.update(bench_retriever(args.sizes, args.repeat))
+    results.update(bench_ephemeral(args.repeat))
+    results.update(bench_classify(args.repeat))
+    results.update(bench_cluster(args.claims, args.repeat))
+    results.update(bench_end_to_end(args.sizes, args.claims, args.repeat))
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "claims": args.claims,
+            "chars": args.chars,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    for name, res in results.items():
+        if "median_ms" in res:
+            print(f"{name:55s} {res['median_ms']:>12.4f} ms")
+        else:
+            print(f"{name:55s} skipped ({res['skipped']})")
+
+    out = Path(args.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print("\nResults written to", out)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for name, r in regressions.items():
+                print(f"  {name}: {r['baseline_ms']} ms -> {r['current_ms']} ms (x{r['ratio']})")
+            return 1
+        print("\nNo regressions vs", args.baseline)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
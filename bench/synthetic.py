@@ -0,0 +1,151 @@
+"""
+Deterministic synthetic data for SafeRAG benchmarks.
+
+- generate_corpus(n):      n evidence passages (1k .. 1M)
+- generate_generation(n):  model output containing n claims (1 .. 200)
+- rare_entity_claims(n):   passages + claims about rare named entities
+- long_generation(n):      long-form model output of about n characters (10k .. 100k)
+
+Same (size, seed) => same output, on every machine.
+Term frequencies follow a Zipf-like distribution so BM25 posting
+lists look like real text (a few huge, most tiny).
+"""
+
+import random
+from itertools import accumulate, islice
+
+SUBJECTS = [
+    "Metformin", "Insulin therapy", "Lifestyle modification", "ACE inhibitors",
+    "Statin therapy", "Aspirin", "Beta blockers", "Index funds",
+    "Diversification", "Government bonds", "Emergency savings", "Equity exposure",
+]
+VERBS = [
+    "is", "are", "should", "must", "can", "will", "has", "was",
+]
+OBJECTS = [
+    "the recommended first line treatment", "required in advanced cases",
+    "not recommended in combination", "associated with lower risk",
+    "used to reduce long-term complications", "effective for most patients",
+    "a common strategy for managing risk", "suitable for long-term investors",
+]
+QUALIFIERS = [
+    "for type 2 diabetes", "in high-risk patients", "for hypertension",
+    "in older adults", "for retirement portfolios", "during market volatility",
+    "according to current guidelines", "when tolerated",
+]
+SYLLABLES = [
+    "ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa",
+    "do", "fe", "gu", "hi", "ja", "ko", "li", "mo", "nu", "ro",
+]
+
+
+def _vocabulary(size, seed):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    # Frequency rank must not follow alphabetical order
+    rng.shuffle(words)
+    return words
+
+
+def _zipf_weights(n, s=1.1):
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def iter_corpus(n_passages, seed=0, vocab_size=5000, filler=(4, 16)):
+    """
+    Yield n_passages synthetic evidence passages.
+    """
+    rng = random.Random(seed)
+    vocab = _vocabulary(vocab_size, seed)
+    cum_weights = list(accumulate(_zipf_weights(vocab_size)))
+
+    for _ in range(n_passages):
+        head = " ".join([
+            rng.choice(SUBJECTS),
+            rng.choice(VERBS),
+            rng.choice(OBJECTS),
+            rng.choice(QUALIFIERS),
+        ])
+        tail = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(*filler))
+        yield f"{head} {' '.join(tail)}."
+
+
+def generate_corpus(n_passages, seed=0, **kwargs):
+    return list(iter_corpus(n_passages, seed=seed, **kwargs))
+
+
+def generate_generation(n_claims, seed=0):
+    """
+    Model output with n_claims extractable claims.
+    """
+    rng = random.Random(seed + 1_000_003)
+    sentences = []
+    for _ in range(n_claims):
+        sentences.append(" ".join([
+            rng.choice(SUBJECTS),
+            rng.choice(VERBS),
+            rng.choice(OBJECTS),
+            rng.choice(QUALIFIERS),
+        ]) + ".")
+    return " ".join(sentences)
+
+
+def sample_claims(n, seed=0):
+    return list(islice(
+        (s.strip() for s in generate_generation(n, seed).split(".") if s.strip()),
+        n,
+    ))
+
+
+def rare_entity_claims(n_entities=50, copies=3, seed=0):
+    """
+    Passages and matching claims about rare entities (a drug or fund name
+    found in only `copies` passages), next to very common claim terms.
+    This is the shape of real claims that dynamic pruning targets.
+    """
+    rng = random.Random(seed + 2_000_003)
+    names = _vocabulary(n_entities, seed + 2_000_003)
+    passages, claims = [], []
+    for name in names:
+        claim = " ".join([
+            name.capitalize(),
+            rng.choice(VERBS),
+            rng.choice(OBJECTS),
+            rng.choice(QUALIFIERS),
+        ])
+        passages.extend([f"{claim} in clinical practice."] * copies)
+        claims.append(claim)
+    return passages, claims
+
+
+def long_generation(n_chars, seed=0):
+    """
+    Long-form model output of about n_chars characters: claims, claims
+    joined by "and" / "but", and verb-less sentences that are not claims.
+    """
+    rng = random.Random(seed + 3_000_003)
+    vocab = _vocabulary(500, seed + 3_000_003)
+    sentences, size = [], 0
+
+    def claim():
+        return " ".join([
+            rng.choice(SUBJECTS),
+            rng.choice(VERBS),
+            rng.choice(OBJECTS),
+            rng.choice(QUALIFIERS),
+        ])
+
+    while size < n_chars:
+        kind = rng.random()
+        if kind < 0.6:
+            sentence = claim() + "."
+        elif kind < 0.8:
+            sentence = f"{claim()} {rng.choice(['and', 'but'])} {claim().lower()}."
+        else:
+            sentence = " ".join(rng.choices(vocab, k=rng.randint(4, 12))).capitalize() + "."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)
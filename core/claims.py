@@ -1,69 +1,158 @@
+"""
+Claim extraction for SafeRAG.
+
+A claim is a sentence (split on . ? !), or a clause of one split on
+"and" / "but", that has a claim verb and an alphabetic word.
+
+- iter_claims            lazy generator of {"text", "start", "end"};
+                         text[start:end] is the claim in the source text,
+                         so callers can stop early and audit logs can
+                         point back into the generation
+- extract_claims         list of claim strings (the pipeline API)
+- extract_claims_batch   many texts, optionally in a process pool
+
+Modes:
+- strict: empty claims => REFUSE
+- fallback: entire text becomes a claim if none extracted
+
+NOTE: patterns are compiled once and each sentence is lower-cased and
+split once; clause tokens reuse the sentence's lower-cased text.
+"""
+
 import re
+from functools import partial
 
 
 # Minimal linguistic markers of factual propositions
-CLAIM_VERBS = {
+CLAIM_VERBS = frozenset({
     "is", "are", "was", "were",
     "should", "must", "can", "will",
     "has", "have", "had",
     "not", "never"
-}
+})
 
+_SENTENCE = re.compile(r"[^.?!]+")
+_CONJUNCTION = re.compile(r"\band\b|\bbut\b")
+_WORD = re.compile(r"[a-zA-Z]{3,}")
 
-def extract_claims(text, mode="strict", max_claims=10):
-    """
-    Extract atomic factual claims from generated text.
 
-    A claim must:
-    - Contain alphabetic words
-    - Contain minimal propositional structure (verbs/modals)
-    - Be bounded and deterministic
+# -------------------------
+# Scanning
+# -------------------------
 
-    Modes:
-    - strict: empty claims => REFUSE
-    - fallback: entire text becomes a claim if none extracted
+def _strip_span(text, start, end):
+    """
+    (start, end) of text[start:end].strip() within text.
     """
+    segment = text[start:end]
+    stripped = segment.lstrip()
+    start += len(segment) - len(stripped)
+    return start, start + len(stripped.rstrip())
 
-    if not text or len(text.strip()) < 5:
-        return []
 
-    sentences = re.split(r"[.?!]", text)
-    claims = []
+def _scan(text):
+    """
+    Yield every claim in text as (start, end), in order.
+
+    Sentences are matched lazily (finditer), so stopping early does not
+    split the rest of the text. Conjunctions are always 3 characters,
+    which gives clause offsets without searching again.
+    """
+    verbs = CLAIM_VERBS
 
-    for s in sentences:
-        s = s.strip()
+    for m in _SENTENCE.finditer(text):
+        piece = m.group()
+        s = piece.strip()
         if len(s) < 5:
             continue
 
-        tokens = s.lower().split()
+        lowered = s.lower()
 
         # Reject low-signal text (no verbs / propositions)
-        if not any(tok in CLAIM_VERBS for tok in tokens):
+        if verbs.isdisjoint(lowered.split()):
             continue
 
         # Reject non-linguistic strings
-        if not re.search(r"[a-zA-Z]{3,}", s):
+        if not _WORD.search(s):
             continue
 
-        parts = re.split(r"\band\b|\bbut\b", s)
-        for p in parts:
-            p = p.strip()
-            ptokens = p.lower().split()
+        start = m.start() + len(piece) - len(piece.lstrip())
+
+        if "and" not in s and "but" not in s:
+            # Single clause: it is the sentence, already checked
+            if len(s) > 5:
+                yield start, start + len(s)
+            continue
+
+        # lower() can change length (e.g. "İ"); slice only when aligned
+        aligned = len(lowered) == len(s)
+        pos = 0
+
+        for part in _CONJUNCTION.split(s):
+            part_start, part_end = pos, pos + len(part)
+            pos = part_end + 3
+
+            p = part.strip()
+            if len(p) <= 5:
+                continue
 
-            if (
-                len(p) > 5
-                and any(tok in CLAIM_VERBS for tok in ptokens)
-                and re.search(r"[a-zA-Z]{3,}", p)
-            ):
-                claims.append(p)
+            p_start, p_end = _strip_span(s, part_start, part_end)
+            ptokens = (lowered[p_start:p_end] if aligned else p.lower()).split()
+            if not verbs.isdisjoint(ptokens) and _WORD.search(p):
+                yield start + p_start, start + p_end
 
-            if len(claims) >= max_claims:
-                break
 
-        if len(claims) >= max_claims:
+# -------------------------
+# Public API
+# -------------------------
+
+def iter_claims(text, mode="strict", max_claims=None):
+    """
+    Lazily yield claims as {"text", "start", "end"} (character offsets
+    into text). max_claims=None means no limit; max_claims <= 0 yields
+    nothing, in either mode.
+    """
+    if not text or len(text.strip()) < 5:
+        return
+    if max_claims is not None and max_claims <= 0:
+        return
+
+    found = 0
+    for start, end in _scan(text):
+        found += 1
+        if max_claims is None or found <= max_claims:
+            yield {"text": text[start:end], "start": start, "end": end}
+        if max_claims is not None and found >= max_claims:
             break
 
-    if not claims and mode == "fallback":
-        return [text.strip()]
+    if not found and mode == "fallback":
+        start, end = _strip_span(text, 0, len(text))
+        yield {"text": text[start:end], "start": start, "end": end}
+
+
+def extract_claims(text, mode="strict", max_claims=10):
+    """
+    Extract atomic factual claims from generated text.
+
+    A claim must:
+    - Contain alphabetic words
+    - Contain minimal propositional structure (verbs/modals)
+    - Be bounded and deterministic
+    """
+    return [c["text"] for c in iter_claims(text, mode, max_claims)]
+
+
+def extract_claims_batch(texts, mode="strict", max_claims=10, workers=1, chunksize=64):
+    """
+    extract_claims for many texts, in order. With workers > 1 texts are
+    processed in a process pool (worth it for long generations only).
+    """
+    extract = partial(extract_claims, mode=mode, max_claims=max_claims)
+
+    if workers <= 1:
+        return [extract(t) for t in texts]
+
+    from concurrent.futures import ProcessPoolExecutor
 
-    return claims[:max_claims]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(extract, texts, chunksize=chunksize))
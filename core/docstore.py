@@ -0,0 +1,128 @@
+"""
+Compact passage storage for SafeRAG.
+
+LAYOUT:
+- <name>.blob         all passages, UTF-8, concatenated
+- <name>.offsets.npy  int64[n + 1]; passage i = blob[offsets[i]:offsets[i + 1]]
+
+Both files are memory-mapped read-only, so worker processes share the
+OS page cache instead of each holding Python string copies. Passages are
+decoded lazily, one at a time, on access.
+"""
+
+from pathlib import Path
+
+
+class DocumentStore:
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    # -------------------------
+    # Construction
+    # -------------------------
+
+    @classmethod
+    def from_texts(cls, texts):
+        """
+        In-memory store (no files) from an iterable of strings.
+        """
+        import numpy as np
+
+        encoded = [t.encode("utf-8") for t in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    @staticmethod
+    def write(texts, path):
+        """
+        Stream texts to <path>.blob / <path>.offsets.npy; returns the count.
+        """
+        with DocumentStoreWriter(path) as writer:
+            for t in texts:
+                writer.add(t)
+        return len(writer)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map a store written by DocumentStore.write.
+        """
+        import mmap
+        import numpy as np
+
+        offsets = np.load(f"{path}.offsets.npy", mmap_mode="r")
+        with open(f"{path}.blob", "rb") as f:
+            if offsets[-1] == 0:
+                blob = b""  # mmap cannot map empty files
+            else:
+                blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(blob, offsets)
+
+    @staticmethod
+    def exists(path):
+        return Path(f"{path}.blob").exists() and Path(f"{path}.offsets.npy").exists()
+
+    # -------------------------
+    # Access
+    # -------------------------
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("document index out of range")
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._blob[start:end].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self):
+        return len(self._blob) + self._offsets.nbytes
+
+
+class DocumentStoreWriter:
+    """
+    Append passages one at a time; the blob is written as it grows, only
+    the offsets (8 bytes per passage) are held in memory until close().
+    """
+
+    def __init__(self, path):
+        from array import array
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(f"{self.path}.blob", "wb")
+        self._offsets = array("q", [0])
+
+    def add(self, text):
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        return len(self._offsets) - 2
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def close(self):
+        import numpy as np
+
+        if self._file.closed:
+            return
+        self._file.close()
+        np.save(f"{self.path}.offsets.npy", np.frombuffer(self._offsets, dtype=np.int64))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,309 @@
+"""
+Embedding backends for SafeRAG semantic scoring.
+
+INTERFACE:
+- encode(texts) -> float32 matrix, one row per text
+
+BACKENDS:
+- sentence-transformer : all-MiniLM-L6-v2 (accurate, needs model download)
+- hashed               : hashed char / word n-grams with TF-IDF weighting
+                         (deterministic, offline, fast on CPU)
+
+Selected per policy via `embedding_backend`.
+
+NOTE: the hashed backend's IDF table is fitted at index build and stored
+in the index directory (build_idf_tables); at runtime it is only fitted
+for in-memory indexes, during warmup.
+"""
+
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+
+from core.telemetry import CACHE_LOOKUPS
+
+DEFAULT_BACKEND = "sentence-transformer"
+
+
+class EmbeddingBackend(ABC):
+    """
+    Base class; a backend without encode() fails when it is created,
+    not on its first request.
+    """
+
+    name = None
+
+    @abstractmethod
+    def encode(self, texts):
+        """
+        float32 matrix, one row per text.
+        """
+
+    def warmup(self):
+        self.encode(["SafeRAG warmup", "SafeRAG warmup"])
+
+
+# -------------------------
+# Transformer backend
+# -------------------------
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    name = "sentence-transformer"
+
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        CACHE_LOOKUPS.inc(cache="model", result="hit" if self._model is not None else "miss")
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import torch
+                    torch.set_num_threads(1)
+                    torch.set_num_interop_threads(1)
+
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+
+        return self._model
+
+    def encode(self, texts):
+        import numpy as np
+
+        emb = self._get_model().encode(list(texts), convert_to_numpy=True)
+        return np.asarray(emb, dtype=np.float32)
+
+
+# -------------------------
+# Hashed n-gram backend
+# -------------------------
+
+_IDF_CORPUS = None
+_IDF_CACHE = None  # (directory, corpus_id): where fitted IDF tables live
+
+
+def set_idf_corpus(documents, cache_dir=None, corpus_id=None):
+    """
+    Register the evidence corpus used to fit IDF weights.
+
+    With cache_dir (the index directory) and corpus_id, fitted tables are
+    read from / written to cache_dir, so each corpus is fitted once, not
+    once per worker process.
+    """
+    global _IDF_CORPUS, _IDF_CACHE
+    _IDF_CORPUS = documents
+    _IDF_CACHE = (Path(cache_dir), corpus_id) if cache_dir and corpus_id else None
+    for backend in _instances.values():
+        if isinstance(backend, HashedNgramBackend):
+            backend.reset_idf()
+
+
+def build_idf_tables(documents, directory, corpus_id, backends, workers=1):
+    """
+    Fit and persist the IDF tables of the given backends (index build).
+    Backends without corpus statistics are skipped.
+    """
+    for name in backends:
+        backend = get_backend(name)
+        if isinstance(backend, HashedNgramBackend):
+            backend.save_idf(backend.fit_idf(documents, workers), directory, corpus_id)
+
+
+@lru_cache(maxsize=1 << 16)
+def _char_ngram_hashes(word, lo, hi):
+    # Words repeat (Zipf), so per-word hashes are memoised
+    w = f" {word} "
+    return tuple(
+        zlib.crc32(w[i:i + n].encode("utf-8"))
+        for n in range(lo, hi + 1)
+        for i in range(len(w) - n + 1)
+    )
+
+
+def _document_frequencies(args):
+    # Process-pool entry point
+    params, texts = args
+    return HashedNgramBackend(*params).document_frequencies(texts)
+
+
+class HashedNgramBackend(EmbeddingBackend):
+    """
+    Signed feature hashing of character n-grams (within word boundaries)
+    and word n-grams, TF-IDF weighted and L2-normalised.
+
+    crc32 is used instead of hash() so vectors are identical across
+    processes and runs (PYTHONHASHSEED).
+    """
+
+    name = "hashed"
+
+    def __init__(self, dim=4096, char_ngrams=(3, 5), word_ngrams=(1, 2)):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.word_ngrams = word_ngrams
+        self._idf = None
+        self._lock = threading.Lock()
+
+    def _features(self, text):
+        words = text.lower().split()
+        feats = []
+
+        lo, hi = self.word_ngrams
+        for n in range(lo, hi + 1):
+            for i in range(len(words) - n + 1):
+                feats.append("w:" + " ".join(words[i:i + n]))
+
+        hashes = [zlib.crc32(f.encode("utf-8")) for f in feats]
+
+        lo, hi = self.char_ngrams
+        for w in words:
+            hashes.extend(_char_ngram_hashes(w, lo, hi))
+
+        return hashes
+
+    def _hashed(self, texts):
+        """
+        Flat (row, bucket, sign) arrays for a batch of texts.
+        """
+        import numpy as np
+
+        rows, hashes = [], []
+        for r, text in enumerate(texts):
+            h = self._features(text)
+            hashes.extend(h)
+            rows.extend([r] * len(h))
+
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        buckets = (hashes % self.dim).astype(np.int64)
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        return np.asarray(rows, dtype=np.int64), buckets, signs
+
+    def reset_idf(self):
+        with self._lock:
+            self._idf = None
+
+    def document_frequencies(self, texts):
+        """
+        Per-bucket document frequency over texts.
+        """
+        import numpy as np
+
+        df = np.zeros(self.dim, dtype=np.float64)
+        for start in range(0, len(texts), 1024):
+            batch = texts[start:start + 1024]
+            rows, buckets, _ = self._hashed(batch)
+            # Each bucket once per document: presence matrix, not np.unique
+            present = np.zeros(len(batch) * self.dim, dtype=bool)
+            present[rows * self.dim + buckets] = True
+            df += present.reshape(len(batch), self.dim).sum(axis=0)
+        return df
+
+    def fit_idf(self, documents, workers=1, chunk=4096):
+        """
+        Smoothed IDF over documents; all ones for an empty corpus.
+        With workers > 1 the corpus is hashed in a process pool.
+        """
+        import numpy as np
+
+        documents = documents if documents is not None else []
+        n = len(documents)
+        chunks = (list(documents[i:i + chunk]) for i in range(0, n, chunk))
+
+        df = np.zeros(self.dim)
+        if workers > 1 and n > chunk:
+            from concurrent.futures import ProcessPoolExecutor
+
+            params = (self.dim, self.char_ngrams, self.word_ngrams)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_document_frequencies, ((params, c) for c in chunks)):
+                    df += part
+        else:
+            for c in chunks:
+                df += self.document_frequencies(c)
+
+        return (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+    def _idf_path(self, directory, corpus_id):
+        (c_lo, c_hi), (w_lo, w_hi) = self.char_ngrams, self.word_ngrams
+        return Path(directory) / (
+            f"idf_{self.name}_{self.dim}_c{c_lo}-{c_hi}_w{w_lo}-{w_hi}_{corpus_id}.npy"
+        )
+
+    def save_idf(self, idf, directory, corpus_id):
+        import numpy as np
+
+        path = self._idf_path(directory, corpus_id)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        with open(tmp, "wb") as f:
+            np.save(f, idf)
+        os.replace(tmp, path)
+
+    def _load_idf(self):
+        import numpy as np
+
+        if _IDF_CACHE is None:
+            return None
+        path = self._idf_path(*_IDF_CACHE)
+        return np.load(path) if path.exists() else None
+
+    def _get_idf(self):
+        CACHE_LOOKUPS.inc(cache="idf", result="hit" if self._idf is not None else "miss")
+        if self._idf is None:
+            with self._lock:
+                if self._idf is None:
+                    idf = self._load_idf()
+                    if idf is None:
+                        idf = self.fit_idf(_IDF_CORPUS)
+                        if _IDF_CACHE is not None:
+                            # Index built before IDF tables were stored
+                            # with it: share the fit with other workers
+                            self.save_idf(idf, *_IDF_CACHE)
+                    self._idf = idf
+
+        return self._idf
+
+    def encode(self, texts):
+        import numpy as np
+
+        texts = list(texts)
+        rows, buckets, signs = self._hashed(texts)
+        flat = np.bincount(
+            rows * self.dim + buckets,
+            weights=signs,
+            minlength=len(texts) * self.dim,
+        )
+        mat = flat.reshape(len(texts), self.dim).astype(np.float32)
+        mat *= self._get_idf()
+
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        np.divide(mat, norms, out=mat, where=norms > 0)
+        return mat
+
+
+# -------------------------
+# Registry
+# -------------------------
+
+BACKENDS = {
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+    HashedNgramBackend.name: HashedNgramBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    name = name or DEFAULT_BACKEND
+    backend = _instances.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {name}")
+        with _instances_lock:
+            backend = _instances.setdefault(name, BACKENDS[name]())
+    return backend
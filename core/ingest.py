@@ -0,0 +1,334 @@
+"""
+Streaming corpus ingestion for SafeRAG.
+
+PIPELINE:
+    sources (.txt / .md / .jsonl files or directories)
+      -> records      streamed line by line, comments and headings skipped
+      -> passages     bounded length, sentence-aware, stable ids + metadata
+      -> tokens       normalised and counted in worker processes
+      -> IndexWriter  straight into the on-disk index (core.retriever)
+      -> IDF tables   for embedding backends that need corpus statistics
+
+Memory stays flat in the corpus size: sources are never read whole, at
+most two batches per worker are in flight, and the index writer spills
+postings to disk.
+
+SOURCE FORMATS:
+- .txt    one passage per line; blank lines and "#" comments skipped
+- .md     paragraphs (blank-line separated); headings become the
+          "section" metadata, HTML comments and code fences skipped
+- .jsonl  one object per line with "text" (or "content"); "id" and other
+          scalar fields are kept as metadata
+
+Passage ids are "<source>:<record>#<chunk>", where record is the line
+number (or the JSONL "id"), so they are stable across rebuilds.
+"""
+
+import json
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from itertools import islice
+from pathlib import Path
+
+from core.retriever import IndexWriter, index_id, load_index, tokenize
+
+SOURCE_SUFFIXES = (".txt", ".md", ".markdown", ".jsonl")
+MAX_PASSAGE_TOKENS = 128
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+# -------------------------
+# Sources
+# -------------------------
+
+def iter_source_files(sources):
+    """
+    Expand files and directories (recursively, sorted) into source files.
+    """
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            for f in sorted(path.rglob("*")):
+                if f.is_file() and f.suffix.lower() in SOURCE_SUFFIXES:
+                    yield f
+        elif path.exists():
+            yield path
+        else:
+            raise FileNotFoundError(f"Missing corpus source: {source}")
+
+
+def corpus_fingerprint(sources, max_tokens=MAX_PASSAGE_TOKENS):
+    """
+    Identifies an index build: source files (size, mtime) and chunking.
+    """
+    return {
+        "sources": [
+            {"source": f.as_posix(), "size": f.stat().st_size, "mtime_ns": f.stat().st_mtime_ns}
+            for f in iter_source_files(sources)
+        ],
+        "max_passage_tokens": max_tokens,
+    }
+
+
+def _iter_text(path):
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield lineno, line, {}
+
+
+def _iter_markdown(path):
+    section = None
+    start, lines = None, []
+    in_fence = False
+
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            stripped = line.strip()
+
+            if stripped.startswith("```") or stripped.startswith("~~~"):
+                in_fence = not in_fence
+                continue
+
+            heading = not in_fence and stripped.startswith("#")
+            comment = stripped.startswith("<!--") and stripped.endswith("-->")
+
+            if in_fence or not stripped or heading or comment:
+                if lines:
+                    yield start, " ".join(lines), {"section": section} if section else {}
+                    start, lines = None, []
+                if heading:
+                    section = stripped.lstrip("#").strip() or None
+                continue
+
+            if start is None:
+                start = lineno
+            lines.append(stripped)
+
+    if lines:
+        yield start, " ".join(lines), {"section": section} if section else {}
+
+
+def _iter_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON ({e})")
+
+            text = obj.get("text") or obj.get("content") or ""
+            if not text.strip():
+                continue
+
+            metadata = {
+                k: v for k, v in obj.items()
+                if k not in ("text", "content") and isinstance(v, (str, int, float, bool))
+            }
+            yield obj.get("id", lineno), text, metadata
+
+
+def iter_records(path):
+    """
+    Yield (source, key, text, metadata) for one source file.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".jsonl":
+        records = _iter_jsonl(path)
+    elif suffix in (".md", ".markdown"):
+        records = _iter_markdown(path)
+    else:
+        records = _iter_text(path)
+
+    source = path.as_posix()
+    for key, text, metadata in records:
+        yield source, key, text, metadata
+
+
+# -------------------------
+# Passages
+# -------------------------
+
+def normalize_text(text):
+    """
+    NFKC (ligatures, full-width forms) and collapsed whitespace. Stored
+    passage text; tokenize applies the same NFKC to claims at query time.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def chunk_text(text, max_tokens=MAX_PASSAGE_TOKENS):
+    """
+    Split text into passages of at most max_tokens whitespace tokens,
+    breaking at sentence ends where possible.
+    """
+    chunks, current, size = [], [], 0
+
+    for sentence in _SENTENCE_END.split(text):
+        words = sentence.split()
+        if not words:
+            continue
+
+        if size and size + len(words) > max_tokens:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+
+        # Sentences longer than a passage are cut at max_tokens
+        while len(words) > max_tokens:
+            chunks.append(" ".join(words[:max_tokens]))
+            words = words[max_tokens:]
+
+        current.extend(words)
+        size += len(words)
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def prepare_batch(records, max_tokens=MAX_PASSAGE_TOKENS):
+    """
+    Worker step: normalise, chunk and count tokens for a batch of records.
+
+    Returns [(passage_id, text, freqs, metadata)], freqs in first-occurrence
+    order as IndexWriter expects.
+    """
+    passages = []
+    for source, key, text, metadata in records:
+        for i, chunk in enumerate(chunk_text(normalize_text(text), max_tokens)):
+            freqs = {}
+            for tok in tokenize(chunk):
+                freqs[tok] = freqs.get(tok, 0) + 1
+            passages.append((
+                f"{source}:{key}#{i}",
+                chunk,
+                freqs,
+                {**metadata, "source": source, "record": key, "chunk": i},
+            ))
+    return passages
+
+
+def _iter_batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_passages(sources, workers=1, batch_size=256, max_tokens=MAX_PASSAGE_TOKENS):
+    """
+    Stream prepared passages in source order.
+
+    With workers > 1, batches are prepared in a process pool with at
+    most 2 batches per worker in flight; results keep submission order.
+    """
+    records = (r for f in iter_source_files(sources) for r in iter_records(f))
+    batches = _iter_batches(records, batch_size)
+
+    if workers <= 1:
+        for batch in batches:
+            yield from prepare_batch(batch, max_tokens)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(prepare_batch, batch, max_tokens))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# -------------------------
+# Index build
+# -------------------------
+
+def ingest(sources, index_dir, workers=1, batch_size=256, max_tokens=MAX_PASSAGE_TOKENS,
+           embedding_backends=()):
+    """
+    Build the on-disk index for sources. The sources and the corpus
+    fingerprint are stored in meta.json ("sources", "source_fingerprint");
+    bootstrap keeps serving (and refreshing) them when SAFERAG_CORPUS is
+    unset. IDF tables of embedding_backends
+    that need corpus statistics are fitted and stored with the index.
+    Returns a stats dict.
+    """
+    started = time.perf_counter()
+    fingerprint = corpus_fingerprint(sources, max_tokens)
+    writer = IndexWriter(index_dir)
+
+    try:
+        for passage_id, text, freqs, metadata in iter_passages(
+            sources, workers=workers, batch_size=batch_size, max_tokens=max_tokens
+        ):
+            writer.add(text, freqs, passage_id=passage_id, metadata=metadata)
+    except BaseException:
+        writer.abort()
+        raise
+
+    passages = writer.close(
+        source_fingerprint=fingerprint,
+        sources=[Path(s).as_posix() for s in sources],
+    )
+
+    if embedding_backends:
+        from core.embeddings import build_idf_tables
+
+        index = load_index(index_dir)
+        build_idf_tables(index["documents"], index_dir, index_id(index), embedding_backends, workers)
+
+    return {
+        "passages": passages,
+        "index_dir": str(index_dir),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SafeRAG corpus ingestion")
+    parser.add_argument("sources", nargs="+", help="files or directories (.txt, .md, .jsonl)")
+    parser.add_argument("--index-dir", default="data/index")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-tokens", type=int, default=MAX_PASSAGE_TOKENS,
+                        help="maximum tokens per passage")
+    parser.add_argument("--embedding-backends", default=None,
+                        help="comma-separated backends to fit IDF tables for "
+                             "(default: those used by policies/*.yaml)")
+    args = parser.parse_args(argv)
+
+    if args.embedding_backends is None:
+        from core.policy import configured_backends
+        backends = configured_backends()
+    else:
+        backends = [b for b in args.embedding_backends.split(",") if b]
+
+    stats = ingest(
+        args.sources,
+        args.index_dir,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        max_tokens=args.max_tokens,
+        embedding_backends=backends,
+    )
+    print(f"Indexed {stats['passages']} passages into {stats['index_dir']} in {stats['elapsed_s']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,12 @@ DEFAULT_POLICY = {
     "claim_extraction_mode": "strict",
     "max_claims": 10,
     "max_evidence_per_claim": 3,
+    "request_evidence_mode": "request",
+    "semantic_threshold": 0.65,
+    "lexical_threshold": 0.35,
+    "embedding_backend": "sentence-transformer",
+    "latency_budget_ms": None,
+    "audit_stage_timings": False,
 }
 
 
@@ -17,3 +23,13 @@ def load_policy(profile="default"):
 
     policy = yaml.safe_load(path.read_text())
     return {**DEFAULT_POLICY, **policy}
+
+
+def configured_backends():
+    """
+    Embedding backends used by the built-in defaults or any policy file.
+    """
+    names = {DEFAULT_POLICY["embedding_backend"]}
+    for path in sorted(Path("policies").glob("*.yaml")):
+        names.add(load_policy(path.stem).get("embedding_backend"))
+    return sorted(n for n in names if n)
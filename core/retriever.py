@@ -1,4 +1,544 @@
-from rank_bm25 import BM25Okapi
+"""
+BM25 evidence retrieval for SafeRAG.
+
+LAYOUT (flat arrays, no per-passage Python objects):
+- documents     DocumentStore (UTF-8 blob + offsets), decoded only for hits
+- vocab         DocumentStore of terms, sorted -> term id = position
+- term_offsets  int64[V + 1]; postings of term t = [term_offsets[t], term_offsets[t + 1])
+- post_docs     int32 document index per posting
+- post_tfs      int32 term frequency per posting
+- doc_len       int32 tokens per document
+- idf           float64[V]
+- term_max      float64[V]; highest single-posting score of each term
+                (upper bound used for MaxScore top-k pruning)
+
+Scoring is Okapi BM25 with the same parameters, IDF floor and
+floating-point evaluation order as rank_bm25.BM25Okapi, so scores and
+rankings are identical to the previous implementation. Top-k queries use
+MaxScore dynamic pruning: common terms are only probed for candidate
+documents, so latency follows k and the rare query terms rather than the
+corpus size. Results equal exhaustive scoring exactly.
+
+A saved index directory is memory-mapped read-only by load(); worker
+processes share it through the OS page cache. IndexWriter builds the same
+directory in a streaming fashion (see core.ingest), adding stable passage
+ids and source metadata.
+
+Publishing and loading an index directory hold index_lock (flock on
+<directory>/.lock), so a process never maps a half-replaced index and
+concurrent builders publish one after another.
+
+EphemeralIndex covers passages supplied with a single request.
+"""
+
+import bisect
+import json
+import math
+import os
+import shutil
+import threading
+import unicodedata
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.docstore import DocumentStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads are still serialized, processes are not
+    fcntl = None
+
+TERM_CACHE_SIZE = 1 << 16
+
+ARRAYS = ("term_offsets", "post_docs", "post_tfs", "doc_len", "idf", "term_max")
+
+
+def tokenize(text):
+    """
+    Lower-cased whitespace tokens of NFKC text (ligatures, full-width
+    forms), so claims match passages normalised at ingestion.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return text.lower().split()
+
+
+# -------------------------
+# Index construction
+# -------------------------
+
+def _bm25_idf(df, n, epsilon):
+    """
+    IDF per term id, in first-occurrence order (matches BM25Okapi's float sums).
+    """
+    idf = [0.0] * len(df)
+    idf_sum = 0.0
+    negative = []
+    for t, freq in enumerate(df):
+        value = math.log(n - freq + 0.5) - math.log(freq + 0.5)
+        idf[t] = value
+        idf_sum += value
+        if value < 0:
+            negative.append(t)
+    eps = epsilon * idf_sum / len(idf) if idf else 0.0
+    for t in negative:
+        idf[t] = eps
+    return idf
+
+
+def _sorted_term_order(terms):
+    """
+    Renumber terms in sorted order so lookups can bisect the vocab store.
+    Returns (order, rank): order[new] = old, rank[old] = new.
+    """
+    import numpy as np
+
+    order = sorted(range(len(terms)), key=terms.__getitem__)
+    rank = np.empty(len(terms), dtype=np.int32)
+    rank[order] = np.arange(len(terms), dtype=np.int32)
+    return order, rank
+
+
+def length_norm(doc_len, meta):
+    """
+    Per-document k1 * (1 - b + b * dl / avgdl), evaluated as BM25Okapi does.
+    """
+    k1, b = meta["k1"], meta["b"]
+    doc_len = doc_len.astype("int64")
+    return k1 * (1 - b + b * doc_len / meta["avgdl"]) if meta["avgdl"] else doc_len
+
+
+def term_upper_bounds(index, chunk=1 << 20):
+    """
+    Highest per-posting BM25 contribution of every term (chunked, so it
+    also works over memory-mapped postings).
+    """
+    import numpy as np
+
+    k1 = index["meta"]["k1"]
+    norm = length_norm(index["doc_len"], index["meta"])
+    term_offsets, idf = index["term_offsets"], index["idf"]
+    term_max = np.full(len(idf), -np.inf)
+
+    for start in range(0, int(term_offsets[-1]), chunk):
+        stop = min(start + chunk, int(term_offsets[-1]))
+        docs = index["post_docs"][start:stop]
+        tf = index["post_tfs"][start:stop].astype(np.int64)
+        t = np.searchsorted(term_offsets, np.arange(start, stop), side="right") - 1
+
+        contrib = idf[t] * (tf * (k1 + 1) / (tf + norm[docs]))
+        first = np.flatnonzero(np.r_[True, t[1:] != t[:-1]])
+        seg = t[first]
+        term_max[seg] = np.maximum(term_max[seg], np.maximum.reduceat(contrib, first))
+
+    return term_max
+
+
+def build_index(documents, k1=1.5, b=0.75, epsilon=0.25):
+    import numpy as np
+    from array import array
+
+    if not isinstance(documents, DocumentStore):
+        documents = DocumentStore.from_texts(documents)
+
+    term_ids = {}
+    terms, df = [], []
+    p_terms, p_docs, p_tfs = array("i"), array("i"), array("i")
+    doc_len = array("i")
+
+    for d, doc in enumerate(documents):
+        tokens = tokenize(doc)
+        doc_len.append(len(tokens))
+
+        for tok, tf in Counter(tokens).items():
+            t = term_ids.get(tok)
+            if t is None:
+                t = term_ids[tok] = len(terms)
+                terms.append(tok)
+                df.append(0)
+            df[t] += 1
+            p_terms.append(t)
+            p_docs.append(d)
+            p_tfs.append(tf)
+
+    n = len(doc_len)
+    avgdl = sum(doc_len) / n if n else 0.0
+    idf = _bm25_idf(df, n, epsilon)
+    order, rank = _sorted_term_order(terms)
+
+    p_terms = rank[np.frombuffer(p_terms, dtype=np.int32)]
+    by_term = np.argsort(p_terms, kind="stable")
+    counts = np.bincount(p_terms, minlength=len(terms))
+
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(counts, out=term_offsets[1:])
+
+    index = {
+        "documents": documents,
+        "vocab": DocumentStore.from_texts(terms[t] for t in order),
+        "term_offsets": term_offsets,
+        "post_docs": np.frombuffer(p_docs, dtype=np.int32)[by_term],
+        "post_tfs": np.frombuffer(p_tfs, dtype=np.int32)[by_term],
+        "doc_len": np.frombuffer(doc_len, dtype=np.int32).copy(),
+        "idf": np.asarray(idf, dtype=np.float64)[order],
+        "meta": {"k1": k1, "b": b, "epsilon": epsilon, "avgdl": avgdl},
+    }
+    index["term_max"] = term_upper_bounds(index)
+    return index
+
+
+# -------------------------
+# Index directory locking
+# -------------------------
+
+_DIR_LOCKS = {}
+_DIR_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def index_lock(directory):
+    """
+    Exclusive lock on an index directory, across processes (flock on
+    <directory>/.lock) and threads. Re-entrant within a thread, so a
+    holder may call load_index / IndexWriter.close itself.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    key = str(directory.resolve())
+
+    with _DIR_LOCKS_GUARD:
+        state = _DIR_LOCKS.setdefault(key, {"lock": threading.RLock(), "fd": None, "depth": 0})
+
+    with state["lock"]:
+        if state["depth"] == 0:
+            fd = os.open(directory / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            state["fd"] = fd
+        state["depth"] += 1
+        try:
+            yield
+        finally:
+            state["depth"] -= 1
+            if state["depth"] == 0:
+                os.close(state["fd"])  # releases the flock
+                state["fd"] = None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_builds(directory):
+    """
+    Delete .tmp-<pid> build directories whose process is gone (left by
+    a crashed or killed build). Returns the number removed.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+
+    removed = 0
+    for tmp in directory.glob(".tmp-*"):
+        try:
+            pid = int(tmp.name[len(".tmp-"):])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            shutil.rmtree(tmp, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _publish(tmp, directory):
+    """
+    Move a finished index from tmp into directory: meta.json is removed
+    first and written last, files the new index lacks are deleted.
+    Runs under index_lock, so loaders never see the intermediate state.
+    """
+    with index_lock(directory):
+        (directory / "meta.json").unlink(missing_ok=True)
+        names = {f.name for f in tmp.iterdir()}
+
+        for f in sorted(tmp.iterdir(), key=lambda p: p.name == "meta.json"):
+            os.replace(f, directory / f.name)
+        for f in directory.iterdir():
+            # Dot files: the lock file and other builders' tmp directories
+            if f.is_file() and f.name not in names and not f.name.startswith("."):
+                f.unlink(missing_ok=True)
+
+
+def save_index(index, directory, **meta):
+    """
+    Write an index directory; extra keyword arguments are stored in
+    meta.json (e.g. a source fingerprint).
+
+    Files are written to a temporary directory and moved into place with
+    meta.json last, so concurrent builders never expose a partial index.
+    """
+    import numpy as np
+
+    directory = Path(directory)
+    tmp = directory / f".tmp-{os.getpid()}"
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    try:
+        DocumentStore.write(index["documents"], tmp / "documents")
+        DocumentStore.write(index["vocab"], tmp / "vocab")
+        for name in ARRAYS:
+            np.save(tmp / f"{name}.npy", index[name])
+        (tmp / "meta.json").write_text(json.dumps({**index["meta"], **meta}))
+        _publish(tmp, directory)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class IndexWriter:
+    """
+    Streaming, on-disk index build (same files as save_index).
+
+    Passages are appended one at a time. Text goes straight to the blob,
+    postings are spilled to temporary files and placed into their final
+    term-sorted arrays by a chunked counting sort in close(). Memory held
+    is the vocabulary plus a few bytes per passage, not the corpus.
+    """
+
+    SPILL_ROWS = 1 << 18
+
+    def __init__(self, directory, k1=1.5, b=0.75, epsilon=0.25):
+        from array import array
+        from core.docstore import DocumentStoreWriter
+
+        self.directory = Path(directory)
+        self._tmp = self.directory / f".tmp-{os.getpid()}"
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        self._tmp.mkdir(parents=True)
+        remove_stale_builds(self.directory)
+        self._params = {"k1": k1, "b": b, "epsilon": epsilon}
+
+        self._documents = DocumentStoreWriter(self._tmp / "documents")
+        self._passage_ids = DocumentStoreWriter(self._tmp / "passage_ids")
+        self._passage_meta = DocumentStoreWriter(self._tmp / "passage_meta")
+
+        self._term_ids = {}
+        self._terms, self._df = [], []
+        self._doc_len = array("i")
+        self._spill = {
+            name: open(self._tmp / f"{name}.spill", "wb")
+            for name in ("terms", "docs", "tfs")
+        }
+        self._buffers = {name: array("i") for name in self._spill}
+        self._postings = 0
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def add(self, text, freqs, passage_id=None, metadata=None):
+        """
+        freqs: {token: count} in first-occurrence order (see tokenize)
+        """
+        d = len(self._doc_len)
+        self._documents.add(text)
+        self._passage_ids.add(str(passage_id if passage_id is not None else d))
+        self._passage_meta.add(json.dumps(metadata or {}))
+        self._doc_len.append(sum(freqs.values()))
+
+        terms, docs, tfs = (self._buffers[k] for k in ("terms", "docs", "tfs"))
+        for tok, tf in freqs.items():
+            t = self._term_ids.get(tok)
+            if t is None:
+                t = self._term_ids[tok] = len(self._terms)
+                self._terms.append(tok)
+                self._df.append(0)
+            self._df[t] += 1
+            terms.append(t)
+            docs.append(d)
+            tfs.append(tf)
+
+        if len(terms) >= self.SPILL_ROWS:
+            self._flush()
+        return d
+
+    def _flush(self):
+        from array import array
+
+        self._postings += len(self._buffers["terms"])
+        for name, buf in self._buffers.items():
+            buf.tofile(self._spill[name])
+            self._buffers[name] = array("i")
+
+    def abort(self):
+        for f in self._spill.values():
+            f.close()
+        for writer in (self._documents, self._passage_ids, self._passage_meta):
+            writer.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def close(self, **meta):
+        """
+        Finish the build and publish it to the directory; returns the
+        number of passages. Extra keyword arguments go to meta.json.
+        """
+        import numpy as np
+
+        try:
+            self._flush()
+            for f in self._spill.values():
+                f.close()
+            for writer in (self._documents, self._passage_ids, self._passage_meta):
+                writer.close()
+
+            n = len(self._doc_len)
+            avgdl = sum(self._doc_len) / n if n else 0.0
+            idf = _bm25_idf(self._df, n, self._params["epsilon"])
+            order, rank = _sorted_term_order(self._terms)
+
+            # One posting per (term, passage): postings per term == df
+            counts = np.asarray(self._df, dtype=np.int64)[order]
+            term_offsets = np.zeros(len(self._terms) + 1, dtype=np.int64)
+            np.cumsum(counts, out=term_offsets[1:])
+
+            self._place_postings(rank, term_offsets)
+
+            arrays = {
+                "term_offsets": term_offsets,
+                "doc_len": np.frombuffer(self._doc_len, dtype=np.int32),
+                "idf": np.asarray(idf, dtype=np.float64)[order],
+                "post_docs": np.load(self._tmp / "post_docs.npy", mmap_mode="r"),
+                "post_tfs": np.load(self._tmp / "post_tfs.npy", mmap_mode="r"),
+                "meta": {**self._params, "avgdl": avgdl},
+            }
+            arrays["term_max"] = term_upper_bounds(arrays)
+            for name in ("term_offsets", "doc_len", "idf", "term_max"):
+                np.save(self._tmp / f"{name}.npy", arrays[name])
+            del arrays
+            DocumentStore.write((self._terms[t] for t in order), self._tmp / "vocab")
+            for name in ("terms", "docs", "tfs"):
+                (self._tmp / f"{name}.spill").unlink()
+
+            (self._tmp / "meta.json").write_text(
+                json.dumps({**self._params, "avgdl": avgdl, **meta})
+            )
+            _publish(self._tmp, self.directory)
+        finally:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+        return n
+
+    def _place_postings(self, rank, term_offsets):
+        """
+        Counting sort of the spilled postings by (sorted) term id, chunk by
+        chunk; passages stay in ascending order within each term.
+        """
+        import numpy as np
+
+        total = self._postings
+        if total == 0:
+            np.save(self._tmp / "post_docs.npy", np.zeros(0, dtype=np.int32))
+            np.save(self._tmp / "post_tfs.npy", np.zeros(0, dtype=np.int32))
+            return
+
+        open_memmap = np.lib.format.open_memmap
+        post_docs = open_memmap(self._tmp / "post_docs.npy", mode="w+", dtype=np.int32, shape=(total,))
+        post_tfs = open_memmap(self._tmp / "post_tfs.npy", mode="w+", dtype=np.int32, shape=(total,))
+        cursor = term_offsets[:-1].copy()
+
+        with open(self._tmp / "terms.spill", "rb") as ft, \
+                open(self._tmp / "docs.spill", "rb") as fd, \
+                open(self._tmp / "tfs.spill", "rb") as ff:
+            while True:
+                terms = np.fromfile(ft, dtype=np.int32, count=self.SPILL_ROWS)
+                if not len(terms):
+                    break
+                docs = np.fromfile(fd, dtype=np.int32, count=len(terms))
+                tfs = np.fromfile(ff, dtype=np.int32, count=len(terms))
+
+                t = rank[terms]
+                by_term = np.argsort(t, kind="stable")
+                t = t[by_term]
+                counts = np.bincount(t, minlength=len(cursor))
+                starts = np.cumsum(counts) - counts
+                pos = cursor[t] + (np.arange(len(t)) - starts[t])
+
+                post_docs[pos] = docs[by_term]
+                post_tfs[pos] = tfs[by_term]
+                cursor += counts
+
+        post_docs.flush()
+        post_tfs.flush()
+        del post_docs, post_tfs
+
+
+def load_index(directory):
+    """
+    Memory-map a published index. Files are mapped under index_lock, so
+    a concurrent rebuild cannot swap them half-way; the mappings stay
+    valid after a later rebuild replaces the files.
+    """
+    import numpy as np
+
+    directory = Path(directory)
+    with index_lock(directory):
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No complete index in {directory} (meta.json missing)")
+
+        index = {
+            "documents": DocumentStore.open(directory / "documents"),
+            "vocab": DocumentStore.open(directory / "vocab"),
+            "meta": json.loads(meta_path.read_text()),
+        }
+        for name in ARRAYS:
+            path = directory / f"{name}.npy"
+            if path.exists():
+                index[name] = np.load(path, mmap_mode="r")
+
+        # Written by IndexWriter (ingestion) only
+        for name in ("passage_ids", "passage_meta"):
+            if DocumentStore.exists(directory / name):
+                index[name] = DocumentStore.open(directory / name)
+
+    # Indexes saved before pruning bounds existed
+    if "term_max" not in index:
+        index["term_max"] = term_upper_bounds(index)
+    return index
+
+
+def read_index_meta(directory):
+    path = Path(directory) / "meta.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def index_id(index):
+    """
+    Short stable id of an index build (meta.json and passage count); keys
+    artefacts derived from the corpus, such as embedding IDF tables.
+    """
+    import hashlib
+
+    key = json.dumps([index["meta"], len(index["doc_len"])], sort_keys=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+# -------------------------
+# Retriever
+# -------------------------
+
+def _below(upper, theta):
+    """
+    upper < theta with slack: bounds are summed in a different order than
+    exact scores, so they may differ in the last bits.
+    """
+    return upper * (1 + 1e-9) + 1e-12 < theta * (1 - 1e-9)
 
 
 class EvidenceRetriever:
@@ -7,31 +547,357 @@ class EvidenceRetriever:
     Returns evidence passages with document IDs and BM25 scores.
     """
 
-    def __init__(self, documents):
-        self.documents = documents
-        self.tokenized_docs = [doc.lower().split() for doc in documents]
-        self.bm25 = BM25Okapi(self.tokenized_docs)
+    def __init__(self, documents=None, index=None):
+        if index is None:
+            index = build_index(documents if documents is not None else [])
+
+        self.index = index
+        self.documents = index["documents"]
+        self.passage_ids = index.get("passage_ids")
+        self._vocab = index["vocab"]
+        self._k1 = index["meta"]["k1"]
+        self._norm = length_norm(index["doc_len"], index["meta"])
+        self._term_cache = {}
+
+    @classmethod
+    def load(cls, directory):
+        return cls(index=load_index(directory))
+
+    def save(self, directory, **meta):
+        save_index(self.index, directory, **meta)
+
+    def metadata(self, doc_id):
+        """
+        Source metadata recorded at ingestion ({} for in-memory indexes).
+        """
+        meta = self.index.get("passage_meta")
+        return json.loads(meta[doc_id]) if meta is not None else {}
+
+    def _term_id(self, token):
+        # Query terms repeat heavily; bisecting the vocab store decodes ~log2(V) terms
+        t = self._term_cache.get(token, -1)
+        if t != -1:
+            return t
+
+        i = bisect.bisect_left(self._vocab, token)
+        t = i if i < len(self._vocab) and self._vocab[i] == token else None
+
+        if len(self._term_cache) >= TERM_CACHE_SIZE:
+            self._term_cache.clear()
+        self._term_cache[token] = t
+        return t
+
+    def _postings(self, t):
+        lo, hi = self.index["term_offsets"][t], self.index["term_offsets"][t + 1]
+        return self.index["post_docs"][lo:hi], self.index["post_tfs"][lo:hi]
+
+    def _contribution(self, t, docs, tf):
+        k1 = self._k1
+        tf = tf.astype("int64")
+        return self.index["idf"][t] * (tf * (k1 + 1) / (tf + self._norm[docs]))
+
+    def _lookup(self, t, candidates):
+        """
+        Contributions of term t for sorted candidate docs, by binary search
+        in its (doc-ordered) posting list. Returns (mask, contributions).
+        """
+        import numpy as np
+
+        docs, tfs = self._postings(t)
+        pos = np.searchsorted(docs, candidates)
+        pos[pos == len(docs)] = 0
+        hit = docs[pos] == candidates
+        return hit, self._contribution(t, candidates[hit], tfs[pos[hit]])
+
+    def get_scores(self, tokens):
+        """
+        Exhaustive BM25 scores for every document.
+        """
+        import numpy as np
+
+        scores = np.zeros(len(self.documents))
+
+        # One pass per query token (duplicates included), like BM25Okapi
+        for tok in tokens:
+            t = self._term_id(tok)
+            if t is None:
+                continue
+            docs, tf = self._postings(t)
+            scores[docs] += self._contribution(t, docs, tf)
+
+        return scores
+
+    def _exhaustive_top_k(self, tokens, k):
+        import numpy as np
+
+        scores = self.get_scores(tokens)
+        n = len(scores)
+        if k < n:
+            kth = np.partition(scores, n - k)[n - k]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(n)
+        return candidates, scores[candidates]
+
+    def _exact_scores(self, term_seq, candidates):
+        """
+        Scores of sorted candidate docs, accumulated in query-token order
+        exactly as get_scores does (bit-identical).
+        """
+        import numpy as np
+
+        scores = np.zeros(len(candidates))
+        for t in term_seq:
+            hit, contrib = self._lookup(t, candidates)
+            scores[hit] += contrib
+        return scores
+
+    def _maxscore_top_k(self, term_seq, k):
+        """
+        MaxScore pruning. Returns (candidates, exact scores) containing the
+        exact top-k, or None when pruning would not beat exhaustive scoring.
+
+        1. Threshold: the rarest query terms' postings are scanned and the
+           best of their documents scored exactly (binary search in the
+           other lists); the k-th best is a lower bound theta on the final
+           k-th score. Queries without rare terms are left to exhaustive
+           scoring, which is cheaper for them.
+        2. Non-essential terms: the largest remaining lists whose summed
+           upper bounds (term_max) stay below theta. A document found only
+           in those cannot reach the top-k, so they are never scanned.
+        3. Essential lists are scanned; documents whose partial score plus
+           the non-essential bounds stays below theta are dropped, the
+           rest are probed in the non-essential lists.
+        """
+        import numpy as np
+
+        term_offsets = self.index["term_offsets"]
+        weight = {}
+        for t in term_seq:
+            weight[t] = weight.get(t, 0) + 1
+        df = {t: int(term_offsets[t + 1] - term_offsets[t]) for t in weight}
+        bound = {t: weight[t] * float(self.index["term_max"][t]) for t in weight}
+        total = sum(df.values())
+
+        def scan(terms):
+            parts = [self._postings(t) for t in terms]
+            docs, inverse = np.unique(np.concatenate([d for d, _ in parts]), return_inverse=True)
+            partial = np.bincount(inverse, weights=np.concatenate([
+                weight[t] * self._contribution(t, d, tf) for t, (d, tf) in zip(terms, parts)
+            ]))
+            return docs, partial
+
+        # 1. Rarest terms (at most 5% of the query's postings)
+        by_df = sorted(weight, key=df.__getitem__)
+        seed, scanned = [], 0
+        for t in by_df:
+            if scanned + df[t] > total // 20:
+                break
+            seed.append(t)
+            scanned += df[t]
+        if not seed:
+            return None  # no rare terms: nothing to prune with
+
+        docs, partial = scan(seed)
+        if len(docs) < k:
+            return None
+        best = docs
+        if len(docs) > 4 * k:
+            top = np.argpartition(partial, len(docs) - 4 * k)[len(docs) - 4 * k:]
+            best = np.sort(docs[top])
+        best_scores = self._exact_scores(term_seq, best)
+        theta = np.partition(best_scores, len(best) - k)[len(best) - k]
+
+        # 2. Largest lists first, as long as their bounds stay below theta
+        non_essential, upper = [], 0.0
+        for t in reversed(by_df[len(seed):]):
+            if _below(upper + bound[t], theta):
+                non_essential.append(t)
+                upper += bound[t]
+        essential = [t for t in by_df if t not in non_essential]
+
+        # Cost model (in postings scanned): essential lists, with unique()
+        # costing a few passes, plus one probe per candidate and
+        # non-essential term; exhaustive scoring scans everything once
+        scanned = sum(df[t] for t in essential)
+        if scanned * (3 + len(non_essential)) > total:
+            return None
+
+        # 3. Scan essential lists, prune, probe non-essential lists
+        candidates, partial = scan(essential)
+        keep = ~_below(partial + upper, theta)
+        candidates, partial = candidates[keep], partial[keep]
+
+        for t in sorted(non_essential, key=bound.__getitem__, reverse=True):
+            hit, contrib = self._lookup(t, candidates)
+            partial[hit] += weight[t] * contrib
+            upper -= bound[t]
+            keep = ~_below(partial + upper, theta)
+            candidates, partial = candidates[keep], partial[keep]
+
+        return candidates, self._exact_scores(term_seq, candidates)
+
+    def top_k(self, tokens, k, exhaustive=False):
+        """
+        Exact top-k as (doc indices, scores), ordered by score, ties by
+        lower document index: identical to ranking get_scores(tokens).
+        """
+        import numpy as np
+
+        n = len(self.documents)
+        k = min(k, n)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        term_seq = [t for t in map(self._term_id, tokens) if t is not None]
+
+        # Bounds need non-negative contributions (negative IDF floor is rare)
+        result = None
+        if not exhaustive and term_seq and min(self.index["idf"][t] for t in term_seq) >= 0:
+            result = self._maxscore_top_k(term_seq, k)
+
+        if result is None:
+            candidates, scores = self._exhaustive_top_k(tokens, k)
+        else:
+            candidates, scores = result
+
+            # Unmatched documents score 0.0 and may tie into the top-k
+            if np.partition(scores, len(scores) - k)[len(scores) - k] <= 0:
+                pool = np.arange(min(n, len(candidates) + k))
+                zeros = np.setdiff1d(pool, candidates)[:k]
+                candidates = np.concatenate([candidates, zeros])
+                scores = np.concatenate([scores, np.zeros(len(zeros))])
+
+        order = np.lexsort((candidates, -scores))[:k]
+        return candidates[order], scores[order]
+
+    def retrieve(self, claim, top_k=3, exhaustive=False):
+        ranked_indices, scores = self.top_k(tokenize(claim), top_k, exhaustive=exhaustive)
+
+        hits = [
+            {
+                "doc_id": int(idx),
+                "text": self.documents[int(idx)],
+                "score": round(float(score), 3)
+            }
+            for idx, score in zip(ranked_indices, scores)
+        ]
+        if self.passage_ids is not None:
+            for hit in hits:
+                hit["passage_id"] = self.passage_ids[hit["doc_id"]]
+        return hits
+
+
+# -------------------------
+# Request-scoped evidence
+# -------------------------
+
+class EphemeralIndex:
+    """
+    BM25 over a handful of caller-supplied passages (one request).
+
+    Plain Python, no NumPy: building only counts terms per passage;
+    document frequencies are resolved for query tokens at retrieval time.
+    Same BM25 parameters and IDF floor as the corpus index.
+    """
+
+    __slots__ = ("ids", "texts", "_freqs", "_norm", "_idf_by_df", "_epsilon", "_eps", "_k1")
+
+    def __init__(self, passages, k1=1.5, b=0.75, epsilon=0.25):
+        """
+        passages: iterable of (id, text); blank passages are dropped
+        """
+        self.ids, self.texts, self._freqs = [], [], []
+        doc_len = []
+
+        for pid, text in passages:
+            if not text or not text.strip():
+                continue
+            freqs = {}
+            tokens = tokenize(text)
+            for tok in tokens:
+                freqs[tok] = freqs.get(tok, 0) + 1
+            self.ids.append(pid)
+            self.texts.append(text)
+            self._freqs.append(freqs)
+            doc_len.append(len(tokens))
+
+        n = len(doc_len)
+        avgdl = sum(doc_len) / n if n else 0.0
+
+        # IDF depends only on document frequency (0..n)
+        self._idf_by_df = [math.log(n - f + 0.5) - math.log(f + 0.5) for f in range(n + 1)]
+        self._epsilon = epsilon
+        self._eps = None
+        self._k1 = k1
+        self._norm = [k1 * (1 - b + b * dl / avgdl) if avgdl else 0.0 for dl in doc_len]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _floor(self):
+        """
+        Replacement for negative IDF: epsilon * mean IDF over all terms.
+        Only needed when a query term occurs in more than half the passages.
+        """
+        if self._eps is None:
+            df = Counter()
+            for freqs in self._freqs:
+                df.update(freqs.keys())
+            idf_sum = sum(self._idf_by_df[f] for f in df.values())
+            self._eps = self._epsilon * idf_sum / len(df) if df else 0.0
+        return self._eps
 
     def retrieve(self, claim, top_k=3):
-        tokens = claim.lower().split()
-        scores = self.bm25.get_scores(tokens)
+        k1 = self._k1
+        n = len(self.ids)
+        scores = [0.0] * n
+
+        for tok in tokenize(claim):
+            tfs = [freqs.get(tok, 0) for freqs in self._freqs]
+            df = n - tfs.count(0)
+            if not df:
+                continue
+            idf = self._idf_by_df[df]
+            if idf < 0:
+                idf = self._floor()
+            for i, tf in enumerate(tfs):
+                if tf:
+                    scores[i] += idf * (tf * (k1 + 1) / (tf + self._norm[i]))
 
-        ranked_indices = sorted(
-            range(len(self.documents)),
-            key=lambda i: scores[i],
-            reverse=True
-        )
+        ranked_indices = sorted(range(n), key=scores.__getitem__, reverse=True)
 
         return [
             {
-                "doc_id": idx,
-                "text": self.documents[idx],
-                "score": round(float(scores[idx]), 3)
+                "doc_id": self.ids[idx],
+                "text": self.texts[idx],
+                "score": round(scores[idx], 3)
             }
             for idx in ranked_indices[:top_k]
         ]
 
 
+def merge_evidence(rankings, top_k=3, k=60):
+    """
+    Reciprocal-rank fusion of evidence lists from different indexes.
+
+    BM25 scores are not comparable across corpora (different IDF), so
+    lists are merged by rank. Ties go to the earlier list; passages with
+    identical text are kept once.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, ev in enumerate(ranking):
+            key = ev["text"]
+            if key in fused:
+                fused[key][0] += 1 / (k + rank + 1)
+            else:
+                fused[key] = [1 / (k + rank + 1), len(fused), ev]
+
+    ordered = sorted(fused.values(), key=lambda f: (-f[0], f[1]))
+    return [ev for _, _, ev in ordered[:top_k]]
+
+
 # -------------------------
 # Functional Wrapper (PRODUCTION)
 # -------------------------
@@ -39,9 +905,10 @@ class EvidenceRetriever:
 _DEFAULT_RETRIEVER = None
 
 
-def initialize_retriever(documents):
+def initialize_retriever(documents=None, index=None):
     global _DEFAULT_RETRIEVER
-    _DEFAULT_RETRIEVER = EvidenceRetriever(documents)
+    _DEFAULT_RETRIEVER = EvidenceRetriever(documents, index=index)
+    return _DEFAULT_RETRIEVER
 
 
 def retrieve_evidence(claim, top_k=3):
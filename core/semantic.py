@@ -1,27 +1,90 @@
 import os
-from sklearn.metrics.pairwise import cosine_similarity
+import time
 
-_model = None
+from core.embeddings import DEFAULT_BACKEND, get_backend
+from core.telemetry import EMBEDDING_CALLS, span
 
+# Heavy modules (numpy, torch, sentence_transformers) are imported by
+# the embedding backends on first use, so importing this module is cheap.
 
-def _get_model():
-    global _model
-    if _model is None:
-        import torch
-        torch.set_num_threads(1)
-        torch.set_num_interop_threads(1)
+# Moving average of one semantic_score call (ms), per backend; seeded by
+# warmup_model so deadline-aware tier selection has an estimate before
+# the first claim. Updated without a lock: a lost update only nudges it.
+PAIR_COST_ALPHA = 0.2
+_pair_cost_ms = {}
 
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
 
-    return _model
+class EmbeddingError(RuntimeError):
+    """
+    Semantic scoring failed (model unavailable, load or encode error).
+    """
+
+
+def _backend_key(backend):
+    if os.environ.get("SAFERAG_NO_EMBEDDINGS") == "1":
+        return "no-embeddings"
+    return backend or DEFAULT_BACKEND
+
+
+def _observe_pair_cost(backend, elapsed_ms):
+    key = _backend_key(backend)
+    previous = _pair_cost_ms.get(key)
+    _pair_cost_ms[key] = elapsed_ms if previous is None else (
+        previous + PAIR_COST_ALPHA * (elapsed_ms - previous)
+    )
 
 
-def semantic_score(claim: str, evidence: str) -> float:
+def expected_pair_cost_ms(backend=None):
+    """
+    Estimated cost of one semantic_score call (ms), or None if unknown.
+    """
+    return _pair_cost_ms.get(_backend_key(backend))
+
+
+def _cosine(a, b) -> float:
+    import numpy as np
+
+    denom = float(np.linalg.norm(a)) * float(np.linalg.norm(b))
+    if denom == 0.0:
+        return 0.0
+    return float(np.dot(a, b)) / denom
+
+
+def warmup_model(backend=None):
+    """
+    Load the embedding backend and run one dummy encode.
+
+    Returns False when embeddings are disabled (SAFERAG_NO_EMBEDDINGS=1).
+    Raises if the backend cannot be loaded.
+    """
+    if os.environ.get("SAFERAG_NO_EMBEDDINGS") == "1":
+        return False
+
+    get_backend(backend).warmup()
+    # Timed call on the warm model seeds expected_pair_cost_ms
+    semantic_score("SafeRAG warmup claim", "SafeRAG warmup evidence", backend)
+    return True
+
+
+def semantic_score(claim: str, evidence: str, backend: str = None) -> float:
     """
     Realistic semantic scoring with CI-safe fallback.
+
+    Embedding failures are NOT swallowed: they raise EmbeddingError and
+    the caller decides how to degrade (see app.service), so a broken
+    model never silently turns claims UNSUPPORTED.
+
+    backend: embedding backend name (core.embeddings); None = default
     """
 
+    t0 = time.perf_counter()
+    with span("semantic_score"):
+        score = _score(claim, evidence, backend)
+    _observe_pair_cost(backend, (time.perf_counter() - t0) * 1000)
+    return score
+
+
+def _score(claim, evidence, backend):
     # Fast / test mode
     if os.environ.get("SAFERAG_NO_EMBEDDINGS") == "1":
         c = claim.lower()
@@ -36,9 +99,11 @@ def semantic_score(claim: str, evidence: str) -> float:
 
         return 0.1  # <-- CRITICAL realism: non-zero noise
 
+    # Unknown backend names are configuration errors, not model failures
+    model = get_backend(backend)
     try:
-        model = _get_model()
-        emb = model.encode([claim, evidence], convert_to_numpy=True)
-        return float(cosine_similarity([emb[0]], [emb[1]])[0][0])
-    except Exception:
-        return 0.1
+        emb = model.encode([claim, evidence])
+    except Exception as e:
+        raise EmbeddingError(f"Embedding backend {model.name!r} failed: {e}") from e
+    EMBEDDING_CALLS.inc()
+    return _cosine(emb[0], emb[1])
@@ -0,0 +1,318 @@
+"""
+Online quality and decision statistics for SafeRAG.
+
+RESPONSIBILITIES:
+- Lifetime and sliding-window aggregates per (policy profile, domain):
+  decision rates, claim label distribution, semantic-score and
+  lexical-overlap quantiles
+- Snapshots for the API (/stats), without re-reading audit logs
+
+NOTE:
+- Constant memory: a series is a lifetime aggregate plus a ring of
+  time buckets; quantiles come from fixed-bin histograms
+  (resolution = bin width, 0.01 by default)
+- The number of series is capped (domain is client-supplied); extra
+  (profile, domain) pairs are folded into one OVERFLOW_KEY series
+- One lock per series, held only for a few increments to the current
+  bucket; bin indices are computed outside it, and a bucket is folded
+  into the lifetime aggregate when its slot is recycled
+
+LAYOUT:
+    RollingStats
+      series[(profile, domain)]
+        lifetime   Aggregate                 (recycled buckets)
+        buckets    [Aggregate] * n_buckets   (ring, bucket_s seconds each)
+"""
+
+import os
+import threading
+import time
+
+QUANTILES = (0.5, 0.9, 0.99)
+SEMANTIC_BINS = (-1.0, 1.0, 200)  # (lo, hi, bins): cosine similarity
+LEXICAL_BINS = (0.0, 1.0, 100)
+OVERFLOW_KEY = ("_other", "_other")
+
+# Claim labels that count towards the hallucination rate
+HALLUCINATION_LABELS = ("REFUTED", "UNSUPPORTED", "RISKY_ABSOLUTE")
+
+
+# -------------------------
+# Sketch
+# -------------------------
+
+class FixedBinSketch:
+    """
+    Fixed-bin histogram over [lo, hi]; values outside are clamped.
+    Quantiles are interpolated within a bin and bounded by the exact
+    min / max.
+    """
+
+    def __init__(self, lo=0.0, hi=1.0, bins=100):
+        if hi <= lo or bins < 1:
+            raise ValueError("FixedBinSketch needs lo < hi and bins >= 1")
+        self.lo = lo
+        self.hi = hi
+        self.bins = bins
+        self.counts = [0] * bins
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def bin_of(self, value):
+        i = int((value - self.lo) / (self.hi - self.lo) * self.bins)
+        return min(max(i, 0), self.bins - 1)
+
+    def add(self, value, i=None):
+        self.counts[self.bin_of(value) if i is None else i] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        width = (self.hi - self.lo) / self.bins
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                value = self.lo + width * (i + (rank - seen) / c)
+                return min(max(value, self.min), self.max)
+            seen += c
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        out = {"count": self.count, "mean": round(self.total / self.count, 4)}
+        for q in QUANTILES:
+            out[f"p{round(q * 100)}"] = round(self.quantile(q), 4)
+        return out
+
+
+# -------------------------
+# Aggregate
+# -------------------------
+
+class Aggregate:
+    """
+    Counts and sketches for one series over one period.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.claims = 0
+        self.decisions = {}
+        self.labels = {}
+        self.semantic = FixedBinSketch(*SEMANTIC_BINS)
+        self.lexical = FixedBinSketch(*LEXICAL_BINS)
+
+    def add(self, decision, labels, semantic, lexical):
+        """
+        semantic / lexical: [(value, bin)] from the matching sketches.
+        """
+        self.requests += 1
+        self.decisions[decision] = self.decisions.get(decision, 0) + 1
+        self.claims += len(labels)
+        for label in labels:
+            self.labels[label] = self.labels.get(label, 0) + 1
+        for value, i in semantic:
+            self.semantic.add(value, i)
+        for value, i in lexical:
+            self.lexical.add(value, i)
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.claims += other.claims
+        for k, v in other.decisions.items():
+            self.decisions[k] = self.decisions.get(k, 0) + v
+        for k, v in other.labels.items():
+            self.labels[k] = self.labels.get(k, 0) + v
+        self.semantic.merge(other.semantic)
+        self.lexical.merge(other.lexical)
+
+    def snapshot(self):
+        requests, claims = max(self.requests, 1), max(self.claims, 1)
+        hallucinated = sum(self.labels.get(l, 0) for l in HALLUCINATION_LABELS)
+        return {
+            "requests": self.requests,
+            "claims": self.claims,
+            "decisions": dict(sorted(self.decisions.items())),
+            "decision_rates": {
+                k: round(v / requests, 4) for k, v in sorted(self.decisions.items())
+            },
+            "labels": dict(sorted(self.labels.items())),
+            "label_rates": {
+                k: round(v / claims, 4) for k, v in sorted(self.labels.items())
+            },
+            "hallucination_rate": round(hallucinated / claims, 4),
+            "semantic_score": self.semantic.summary(),
+            "lexical_overlap": self.lexical.summary(),
+        }
+
+
+# -------------------------
+# Rolling statistics
+# -------------------------
+
+class _Series:
+    def __init__(self, n_buckets):
+        self.lifetime = Aggregate()
+        self.buckets = [None] * n_buckets
+        self.epochs = [None] * n_buckets
+        self.lock = threading.Lock()
+
+
+class RollingStats:
+    """
+    Lifetime and sliding-window statistics per (profile, domain).
+
+    The window is window_s seconds split into n_buckets buckets, so it
+    slides in steps of window_s / n_buckets.
+    """
+
+    def __init__(self, window_s=300, n_buckets=30, max_series=64, clock=time.monotonic):
+        if window_s <= 0 or n_buckets < 1:
+            raise ValueError("window_s must be > 0 and n_buckets >= 1")
+        if max_series < 1:
+            raise ValueError("max_series must be >= 1")
+
+        self.window_s = window_s
+        self.n_buckets = n_buckets
+        self.bucket_s = window_s / n_buckets
+        self.max_series = max_series
+        self.clock = clock
+
+        self._series = {}
+        self._lock = threading.Lock()  # guards _series membership
+        # Bin lookups only; never mutated
+        self._semantic_bins = FixedBinSketch(*SEMANTIC_BINS)
+        self._lexical_bins = FixedBinSketch(*LEXICAL_BINS)
+
+    def _get_series(self, key):
+        series = self._series.get(key)
+        if series is not None:
+            return series
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= self.max_series:
+                    key = OVERFLOW_KEY
+                    series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series(self.n_buckets)
+        return series
+
+    def record(self, decision, claims=(), profile="default", domain="default", now=None):
+        """
+        Record one request.
+
+        claims: dicts with "label" and optionally "semantic_score",
+        "lexical_overlap" and "tier". Lexical-tier claims were never
+        scored semantically, so their semantic_score is not sampled.
+        """
+        labels = [c["label"] for c in claims]
+        semantic = [
+            (c["semantic_score"], self._semantic_bins.bin_of(c["semantic_score"]))
+            for c in claims
+            if c.get("semantic_score") is not None and c.get("tier") != "lexical"
+        ]
+        lexical = [
+            (c["lexical_overlap"], self._lexical_bins.bin_of(c["lexical_overlap"]))
+            for c in claims if c.get("lexical_overlap") is not None
+        ]
+
+        epoch = int((self.clock() if now is None else now) // self.bucket_s)
+        i = epoch % self.n_buckets
+        series = self._get_series((str(profile), str(domain)))
+
+        with series.lock:
+            bucket = series.buckets[i]
+            if series.epochs[i] != epoch:
+                # Recycle the expired slot; its counts move to lifetime
+                if bucket is not None:
+                    series.lifetime.merge(bucket)
+                bucket = series.buckets[i] = Aggregate()
+                series.epochs[i] = epoch
+            bucket.add(decision, labels, semantic, lexical)
+
+    def _aggregates(self, series, epoch):
+        """
+        (window, lifetime) for one series as of bucket epoch.
+        """
+        window, lifetime = Aggregate(), Aggregate()
+        with series.lock:
+            lifetime.merge(series.lifetime)
+            for bucket, e in zip(series.buckets, series.epochs):
+                if bucket is None:
+                    continue
+                lifetime.merge(bucket)
+                if epoch - self.n_buckets < e <= epoch:
+                    window.merge(bucket)
+        return window, lifetime
+
+    def snapshot(self, profile=None, domain=None, now=None):
+        """
+        {"window_s", "series": [{profile, domain, window, lifetime}],
+         "total": {window, lifetime}}, optionally filtered.
+        """
+        epoch = int((self.clock() if now is None else now) // self.bucket_s)
+        total_window, total_lifetime = Aggregate(), Aggregate()
+        out = []
+        with self._lock:
+            items = sorted(self._series.items(), key=lambda kv: kv[0])
+
+        for (p, d), series in items:
+            if profile is not None and p != profile:
+                continue
+            if domain is not None and d != domain:
+                continue
+
+            window, lifetime = self._aggregates(series, epoch)
+            total_window.merge(window)
+            total_lifetime.merge(lifetime)
+            out.append({
+                "profile": p,
+                "domain": d,
+                "window": window.snapshot(),
+                "lifetime": lifetime.snapshot(),
+            })
+
+        return {
+            "window_s": self.window_s,
+            "series": out,
+            "total": {
+                "window": total_window.snapshot(),
+                "lifetime": total_lifetime.snapshot(),
+            },
+        }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+def stats_from_env():
+    return RollingStats(
+        window_s=float(os.environ.get("SAFERAG_STATS_WINDOW_S", 300)),
+        n_buckets=int(os.environ.get("SAFERAG_STATS_BUCKETS", 30)),
+        max_series=int(os.environ.get("SAFERAG_STATS_MAX_SERIES", 64)),
+    )
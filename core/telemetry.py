@@ -0,0 +1,256 @@
+"""
+Lightweight telemetry for SafeRAG.
+
+RESPONSIBILITIES:
+- Counters / gauges / fixed-bucket histograms (process-wide)
+- Timing spans around pipeline stages
+- Optional per-request stage timings (for audit events)
+- Prometheus text exposition
+
+NOTE:
+- No external dependencies
+- One lock per metric; a span costs ~1-2 µs
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LATENCY_BUCKETS_MS = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+_REGISTRY = []
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {sorted(labels)}")
+    return tuple(str(labels[n]) for n in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(n, v.replace("\\", "\\\\").replace('"', '\\"'))
+        for n, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(v):
+    if v == int(v):
+        return str(int(v))
+    return repr(float(v))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (_REGISTRY if registry is None else registry).append(self)
+
+    def inc(self, value=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}"
+            for k, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._series = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        (_REGISTRY if registry is None else registry).append(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        n = len(self.buckets)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * n + [0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < n:
+                series[i] += 1
+            series[n] += value
+            series[n + 1] += 1
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(self.labelnames, labels))
+        return series[-1] if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        n = len(self.buckets)
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, series[:n]):
+                cumulative += c
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {series[n + 1]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(series[n], 6))}")
+            lines.append(f"{self.name}_count{labels} {series[n + 1]}")
+        return lines
+
+
+# -------------------------
+# SafeRAG metrics
+# -------------------------
+
+STAGE_LATENCY = Histogram(
+    "saferag_stage_latency_ms",
+    "Latency of each pipeline stage in milliseconds.",
+    LATENCY_BUCKETS_MS,
+    labelnames=("stage",),
+)
+CLAIMS_PER_REQUEST = Histogram(
+    "saferag_claims_per_request",
+    "Number of claims extracted per request.",
+    COUNT_BUCKETS,
+)
+EVIDENCE_PER_CLAIM = Histogram(
+    "saferag_evidence_per_claim",
+    "Number of evidence passages retrieved per claim.",
+    COUNT_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "saferag_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss).",
+    labelnames=("cache", "result"),
+)
+DECISIONS = Counter(
+    "saferag_decisions_total",
+    "System decisions by type.",
+    labelnames=("decision",),
+)
+EMBEDDING_CALLS = Counter(
+    "saferag_embedding_calls_total",
+    "Calls to the embedding model.",
+)
+ERRORS = Counter(
+    "saferag_errors_total",
+    "Pipeline errors.",
+)
+DEGRADED_CLAIMS = Counter(
+    "saferag_degraded_claims_total",
+    "Claims verified below the full tier, by tier and reason.",
+    labelnames=("tier", "reason"),
+)
+
+
+# -------------------------
+# Timing spans
+# -------------------------
+
+_request_timings = ContextVar("saferag_request_timings", default=None)
+
+
+def start_request_timings():
+    """
+    Begin collecting per-request stage timings in the current context.
+    Returns a token for stop_request_timings().
+    """
+    return _request_timings.set({})
+
+
+def stop_request_timings(token):
+    """
+    Stop collecting and return {stage: total_ms} for the request.
+    """
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return {k: round(v, 3) for k, v in (timings or {}).items()}
+
+
+def current_request_timings():
+    """
+    Snapshot of {stage: total_ms} collected so far, or None if the
+    current context is not collecting.
+    """
+    timings = _request_timings.get()
+    if timings is None:
+        return None
+    return {k: round(v, 3) for k, v in timings.items()}
+
+
+@contextmanager
+def span(stage):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        STAGE_LATENCY.observe(elapsed_ms, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed_ms
+
+
+# -------------------------
+# Exposition
+# -------------------------
+
+def render_prometheus(registry=None):
+    lines = []
+    for metric in _REGISTRY if registry is None else registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for metric in _REGISTRY:
+        metric.reset()
@@ -14,6 +14,12 @@ from core.semantic import semantic_score
 # Linguistic signals
 # -------------------------
 
+# Verification tiers, from most to least expensive.
+#   full    : semantic + lexical signals over max_evidence_per_claim passages
+#   reduced : semantic + lexical signals over the single best passage
+#   lexical : phrase / lexical signals only (no embedding calls)
+VERIFICATION_TIERS = ("full", "reduced", "lexical")
+
 NEGATION_TERMS = {"not", "no", "never", "avoid", "contraindicated"}
 ABSOLUTE_TERMS = {"never", "always", "guarantees", "completely"}
 
@@ -51,32 +57,52 @@ def _phrase_match(claim_l: str, evidence_l: str) -> bool:
 # Claim Truth Classification
 # -------------------------
 
-def classify_claim(claim: str, evidence: str):
+# Default support thresholds (overridable per policy)
+SEMANTIC_THRESHOLD = 0.65
+LEXICAL_THRESHOLD = 0.35
+
+
+def claim_features(claim: str, evidence: str, tier: str = "full", backend: str = None):
     """
-    OUTPUT STATES:
-    - VERIFIED
-    - REFUTED
-    - UNSUPPORTED
-    - RISKY_ABSOLUTE
+    Raw, threshold-free signals for one claim–evidence pair.
+
+    The "lexical" tier skips the embedding call entirely (semantic = 0.0).
+    backend: embedding backend name (core.embeddings); None = default
     """
 
+    if tier not in VERIFICATION_TIERS:
+        raise ValueError(f"Unknown verification tier: {tier}")
+
     claim_l = claim.lower()
     evidence_l = evidence.lower()
 
     claim_tokens = set(claim_l.split())
     evidence_tokens = set(evidence_l.split())
 
-    semantic = semantic_score(claim, evidence)
-    lexical_overlap = len(claim_tokens & evidence_tokens) / max(len(claim_tokens), 1)
+    if tier == "lexical":
+        semantic = 0.0
+    else:
+        semantic = semantic_score(claim, evidence, backend)
+
+    return {
+        "semantic": semantic,
+        "lexical_overlap": len(claim_tokens & evidence_tokens) / max(len(claim_tokens), 1),
+        "phrase_match": _phrase_match(claim_l, evidence_l),
+        "has_absolute": any(t in claim_tokens for t in ABSOLUTE_TERMS),
+        "neg_claim": any(t in claim_tokens for t in NEGATION_TERMS),
+    }
 
-    has_absolute = any(t in claim_tokens for t in ABSOLUTE_TERMS)
-    neg_claim = any(t in claim_tokens for t in NEGATION_TERMS)
 
+def label_from_features(
+    features,
+    semantic_threshold=SEMANTIC_THRESHOLD,
+    lexical_threshold=LEXICAL_THRESHOLD,
+):
     # --------------------------------------------------
     # VERIFIED — phrase grounding (highest confidence)
     # --------------------------------------------------
-    if _phrase_match(claim_l, evidence_l):
-        return _result("VERIFIED", semantic, lexical_overlap)
+    if features["phrase_match"]:
+        return "VERIFIED"
 
     # --------------------------------------------------
     # REFUTED — SAFETY-FIRST ABSOLUTE NEGATION
@@ -85,24 +111,52 @@ def classify_claim(claim: str, evidence: str):
     #   "never used", "always safe"
     # are treated as contradictions unless explicitly supported.
     # --------------------------------------------------
-    if has_absolute and neg_claim:
-        return _result("REFUTED", semantic, lexical_overlap)
+    if features["has_absolute"] and features["neg_claim"]:
+        return "REFUTED"
 
     # --------------------------------------------------
     # VERIFIED — semantic / lexical support
     # --------------------------------------------------
-    if semantic >= 0.65 or lexical_overlap >= 0.35:
-        return _result("VERIFIED", semantic, lexical_overlap)
+    if (
+        features["semantic"] >= semantic_threshold
+        or features["lexical_overlap"] >= lexical_threshold
+    ):
+        return "VERIFIED"
 
     # --------------------------------------------------
     # UNSUPPORTED — default
     # --------------------------------------------------
-    return _result("UNSUPPORTED", semantic, lexical_overlap)
+    return "UNSUPPORTED"
+
+
+def classify_claim(
+    claim: str,
+    evidence: str,
+    tier: str = "full",
+    semantic_threshold: float = SEMANTIC_THRESHOLD,
+    lexical_threshold: float = LEXICAL_THRESHOLD,
+    backend: str = None,
+):
+    """
+    OUTPUT STATES:
+    - VERIFIED
+    - REFUTED
+    - UNSUPPORTED
+    - RISKY_ABSOLUTE
+
+    The "lexical" tier skips the embedding call entirely; its verdicts
+    rely on phrase grounding and lexical overlap only.
+    """
+
+    features = claim_features(claim, evidence, tier, backend)
+    label = label_from_features(features, semantic_threshold, lexical_threshold)
+    return _result(label, features["semantic"], features["lexical_overlap"], tier)
 
 
-def _result(label, semantic, overlap):
+def _result(label, semantic, overlap, tier):
     return {
         "label": label,
         "semantic_score": round(float(semantic), 3),
         "lexical_overlap": round(float(overlap), 3),
+        "tier": tier,
     }
@@ -1,6 +1,10 @@
 import sys
 import json
+import time
+import argparse
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 
 # --------------------------------------------------
 # Ensure project root is on PYTHONPATH
@@ -9,143 +13,246 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
 from saferag_bootstrap import bootstrap
+from app.audit import set_audit_enabled
 from app.service import run_saferag
 from app.schemas import SafeRAGRequest
 
+HALLUCINATION_LABELS = {"REFUTED", "UNSUPPORTED", "RISKY_ABSOLUTE"}
+DECISIONS = ["ACCEPT", "REFUSE", "REJECT"]
+
 
 # --------------------------------------------------
-# Baseline: Pass-through (NO gating)
+# Dataset streaming
 # --------------------------------------------------
-def run_pass_through_baseline(path):
+def iter_examples(path):
     """
-    Baseline evaluation:
-    - Runs the full pipeline
-    - Ignores ACCEPT / REFUSE / REJECT
-    - Counts how many claims are NOT VERIFIED
-    - Represents raw hallucination generation rate
+    Stream examples from a JSONL dataset (never loads the whole file).
     """
-
-    total_claims = 0
-    hallucinated_claims = 0
-
     with open(path) as f:
         for line in f:
-            if not line.strip():
-                continue
+            if line.strip():
+                yield json.loads(line)
 
-            ex = json.loads(line)
 
-            req = SafeRAGRequest(
-                request_id=ex["id"],
-                generated_text=ex["generation"],
-            )
+def iter_batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
 
-            _, claims, _ = run_saferag(req)
 
-            total_claims += len(claims)
-            hallucinated_claims += sum(
-                c["label"] != "VERIFIED" for c in claims
-            )
+# --------------------------------------------------
+# Single-pass scoring
+# --------------------------------------------------
+def new_counts():
+    return {
+        "examples": 0,
+        "total_claims": 0,
+        # Baseline (no gating): every non-VERIFIED claim is a hallucination
+        "hallucinated_claims": 0,
+        # SafeRAG (gated): hallucinations count ONLY if decision == ACCEPT
+        "passed_hallucinations": 0,
+        "blocked_claims": 0,
+        "safe_refusals": 0,
+        "hard_rejections": 0,
+        "errors": 0,
+        "decision_counts": {d: 0 for d in DECISIONS},
+    }
+
 
-    print("Baseline (no gating):")
-    print("  Total claims:", total_claims)
-    print("  Hallucinated claims:", hallucinated_claims)
-    print(
-        "  Hallucination rate:",
-        round(hallucinated_claims / max(total_claims, 1), 3),
+def score_example(counts, decision, claims):
+    """
+    Fold one pipeline result into both baseline and gated counts.
+    """
+    counts["examples"] += 1
+    counts["total_claims"] += len(claims)
+    counts["decision_counts"][decision] = counts["decision_counts"].get(decision, 0) + 1
+
+    if decision == "ERROR":
+        counts["errors"] += 1
+        return counts
+
+    counts["hallucinated_claims"] += sum(
+        c["label"] != "VERIFIED" for c in claims
     )
 
+    # --------------------------------------
+    # Exposure vs containment
+    # --------------------------------------
+    if decision == "ACCEPT":
+        counts["passed_hallucinations"] += sum(
+            c["label"] in HALLUCINATION_LABELS for c in claims
+        )
+    else:
+        counts["blocked_claims"] += len(claims)
+
+        if decision == "REFUSE":
+            counts["safe_refusals"] += 1
+        elif decision == "REJECT":
+            counts["hard_rejections"] += 1
+
+    return counts
+
+
+def merge_counts(total, part):
+    for k, v in part.items():
+        if k == "decision_counts":
+            for d, n in v.items():
+                total[k][d] = total[k].get(d, 0) + n
+        else:
+            total[k] += v
+    return total
+
+
+def evaluate_examples(examples):
+    counts = new_counts()
+    for ex in examples:
+        req = SafeRAGRequest(
+            request_id=ex["id"],
+            generated_text=ex["generation"],
+        )
+        decision, claims, _ = run_saferag(req)
+        score_example(counts, decision, claims)
+    return counts
+
+
+def build_report(counts):
+    total = max(counts["total_claims"], 1)
+    return {
+        "examples": counts["examples"],
+        "total_claims": counts["total_claims"],
+        "errors": counts["errors"],
+        "baseline": {
+            "hallucinated_claims": counts["hallucinated_claims"],
+            "hallucination_rate": round(counts["hallucinated_claims"] / total, 3),
+        },
+        "saferag": {
+            "passed_hallucinations": counts["passed_hallucinations"],
+            "pass_through_hallucination_rate": round(counts["passed_hallucinations"] / total, 3),
+            "blocked_claims": counts["blocked_claims"],
+            "safe_refusals": counts["safe_refusals"],
+            "hard_rejections": counts["hard_rejections"],
+            "decision_counts": counts["decision_counts"],
+        },
+    }
+
 
 # --------------------------------------------------
-# SafeRAG Evaluation: Safety-gated exposure
+# Parallel engine
 # --------------------------------------------------
-def run_eval(path):
+def _init_worker(audit):
+    # Once per worker process: loads the index the parent built + policy
+    set_audit_enabled(audit)
+    bootstrap()
+
+
+def evaluate(path, workers=1, batch_size=64, audit=False):
     """
-    SafeRAG evaluation:
-    - Hallucinations count ONLY if decision == ACCEPT
-    - REFUSE / REJECT are treated as successful safety containment
-    - Uses final truth labels:
-        VERIFIED | REFUTED | UNSUPPORTED | RISKY_ABSOLUTE
+    Evaluate a JSONL dataset in a single pass.
+
+    Each example runs through run_saferag ONCE; baseline and gated
+    metrics are derived from the same claim results. With workers > 1,
+    batches are spread over a process pool with at most 2 batches per
+    worker in flight, so memory stays bounded for any dataset size.
     """
+    started = time.perf_counter()
+    counts = new_counts()
+    batches = iter_batches(iter_examples(path), batch_size)
 
-    total_claims = 0
-    passed_hallucinations = 0
+    if workers <= 1:
+        previous = set_audit_enabled(audit)
+        try:
+            bootstrap()
+            for batch in batches:
+                merge_counts(counts, evaluate_examples(batch))
+        finally:
+            set_audit_enabled(previous)
+    else:
+        # Build (or check) the on-disk index once, before the workers
+        # start; they then only memory-map it
+        bootstrap()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(audit,),
+        ) as pool:
+            pending = set()
+            for batch in batches:
+                pending.add(pool.submit(evaluate_examples, batch))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        merge_counts(counts, fut.result())
+            for fut in pending:
+                merge_counts(counts, fut.result())
 
-    blocked_claims = 0
-    safe_refusals = 0
-    hard_rejections = 0
+    report = build_report(counts)
+    report["dataset"] = str(path)
+    report["workers"] = workers
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return report
 
-    decision_counts = {
-        "ACCEPT": 0,
-        "REFUSE": 0,
-        "REJECT": 0,
-    }
 
-    with open(path) as f:
-        for line in f:
-            if not line.strip():
-                continue
-
-            ex = json.loads(line)
-
-            req = SafeRAGRequest(
-                request_id=ex["id"],
-                generated_text=ex["generation"],
-            )
-
-            decision, claims, _ = run_saferag(req)
-
-            decision_counts[decision] += 1
-            total_claims += len(claims)
-
-            # --------------------------------------
-            # Exposure vs containment
-            # --------------------------------------
-            if decision == "ACCEPT":
-                passed_hallucinations += sum(
-                    c["label"] in {
-                        "REFUTED",
-                        "UNSUPPORTED",
-                        "RISKY_ABSOLUTE",
-                    }
-                    for c in claims
-                )
-            else:
-                blocked_claims += len(claims)
-
-                if decision == "REFUSE":
-                    safe_refusals += 1
-                elif decision == "REJECT":
-                    hard_rejections += 1
+def print_report(report):
+    baseline = report["baseline"]
+    gated = report["saferag"]
+
+    print("Baseline (no gating):")
+    print("  Total claims:", report["total_claims"])
+    print("  Hallucinated claims:", baseline["hallucinated_claims"])
+    print("  Hallucination rate:", baseline["hallucination_rate"])
 
     print("SafeRAG (with gating):")
-    print("  Total claims:", total_claims)
-    print("  Hallucinations reaching user:", passed_hallucinations)
-    print(
-        "  Pass-through hallucination rate:",
-        round(passed_hallucinations / max(total_claims, 1), 3),
-    )
+    print("  Total claims:", report["total_claims"])
+    print("  Hallucinations reaching user:", gated["passed_hallucinations"])
+    print("  Pass-through hallucination rate:", gated["pass_through_hallucination_rate"])
 
     print("\nSafety containment:")
-    print("  Blocked claims:", blocked_claims)
-    print("  Safe refusals (uncertainty):", safe_refusals)
-    print("  Hard rejections (contradictions):", hard_rejections)
+    print("  Blocked claims:", gated["blocked_claims"])
+    print("  Safe refusals (uncertainty):", gated["safe_refusals"])
+    print("  Hard rejections (contradictions):", gated["hard_rejections"])
 
     print("\nDecision distribution:")
-    for k in ["ACCEPT", "REFUSE", "REJECT"]:
-        print(f"  {k}: {decision_counts[k]}")
+    for k in DECISIONS:
+        print(f"  {k}: {gated['decision_counts'].get(k, 0)}")
+    if report["errors"]:
+        print(f"  ERROR: {report['errors']}")
 
 
 # --------------------------------------------------
 # Main
 # --------------------------------------------------
-if __name__ == "__main__":
-    bootstrap()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SafeRAG evaluation")
+    parser.add_argument(
+        "datasets",
+        nargs="*",
+        default=["eval/datasets/clinical.jsonl", "eval/datasets/finance.jsonl"],
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--audit", action="store_true", help="write an audit line per example")
+    parser.add_argument("--output", default=None, help="write JSON report")
+    args = parser.parse_args(argv)
 
-    print("=== CLINICAL DATASET ===")
-    run_pass_through_baseline("eval/datasets/clinical.jsonl")
-    run_eval("eval/datasets/clinical.jsonl")
+    reports = []
+    for i, path in enumerate(args.datasets):
+        report = evaluate(path, workers=args.workers, batch_size=args.batch_size, audit=args.audit)
+        reports.append(report)
 
-    print("\n=== FINANCE DATASET ===")
-    run_pass_through_baseline("eval/datasets/finance.jsonl")
-    run_eval("eval/datasets/finance.jsonl")
+        print(("\n" if i else "") + f"=== {Path(path).stem.upper()} DATASET ===")
+        print_report(report)
+
+    if args.output:
+        out = Path(args.output)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps({"reports": reports}, indent=2))
+        print("\nReport written to", out)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""
+SafeRAG policy-threshold sweep.
+
+Computes raw claim–evidence features ONCE per dataset (retrieval +
+embeddings are the expensive part), caches them as .npz, then re-derives
+labels and decisions for a whole grid of thresholds and policy profiles
+with vectorized NumPy.
+
+Swept:
+- semantic_threshold  (default policy 0.65)
+- lexical_threshold   (default policy 0.35)
+- policy profiles     (on_insufficient, extraction / retrieval settings)
+
+Not swept: min_support_rate — the system decision in app.service does
+not consult it (ACCEPT requires every claim VERIFIED).
+
+Embedding failures abort the sweep (nothing is cached): thresholds fitted
+on lexical-only features would not hold for the backend.
+
+Usage:
+    python eval/sweep.py
+    python eval/sweep.py eval/datasets/clinical.jsonl \
+        --semantic 0.3:0.95:0.01 --lexical 0.1:0.9:0.01 --profiles default \
+        --output eval/sweep.json
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# --------------------------------------------------
+# Ensure project root is on PYTHONPATH
+# --------------------------------------------------
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from saferag_bootstrap import bootstrap, corpus_index_dir, corpus_sources
+from core.claims import extract_claims
+from core.ingest import corpus_fingerprint
+from core.policy import load_policy
+from core.retriever import read_index_meta, retrieve_evidence
+from core.semantic import EmbeddingError
+from core.verifier import claim_features
+from eval.run_eval import iter_examples
+
+CACHE_DIR = Path("eval/cache")
+
+
+# --------------------------------------------------
+# Feature extraction (expensive, cached)
+# --------------------------------------------------
+def _corpus_key():
+    """
+    Fingerprint of the corpus bootstrap serves; the index's own when its
+    recorded sources are gone (it is then served as built).
+    """
+    index_dir = corpus_index_dir()
+    meta = read_index_meta(index_dir) if index_dir else None
+    try:
+        return corpus_fingerprint(corpus_sources(meta))
+    except FileNotFoundError:
+        return (meta or {}).get("source_fingerprint")
+
+
+def _cache_key(path, policy):
+    stat = Path(path).stat()
+    key = {
+        "dataset": str(Path(path).resolve()),
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        # Every corpus source (SAFERAG_CORPUS or the index's) and the chunking
+        "corpus": _corpus_key(),
+        "mode": policy.get("claim_extraction_mode", "strict"),
+        "max_claims": policy.get("max_claims", 10),
+        "top_k": policy.get("max_evidence_per_claim", 3),
+        "no_embeddings": os.environ.get("SAFERAG_NO_EMBEDDINGS"),
+        "backend": policy.get("embedding_backend"),
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _pair_features(claim, evidences, backend):
+    # No lexical fallback (unlike app.service): lexical-only features would
+    # be cached and swept as if they were the backend's scores
+    try:
+        return [claim_features(claim, ev["text"], backend=backend) for ev in evidences]
+    except EmbeddingError as e:
+        raise RuntimeError(f"Embedding backend failed; cannot sweep: {e}") from e
+
+
+def extract_features(path, policy):
+    """
+    Flatten a dataset into per-pair / per-claim / per-example arrays.
+
+    Pairs are grouped by claim and claims by example (both in order),
+    so segment reductions can use np.*.reduceat.
+    """
+    bootstrap()
+
+    semantic, lexical, phrase, pair_claim = [], [], [], []
+    absneg, claim_example = [], []
+    n_examples = 0
+
+    for ex in iter_examples(path):
+        claims = extract_claims(
+            ex["generation"],
+            mode=policy.get("claim_extraction_mode", "strict"),
+            max_claims=policy.get("max_claims", 10),
+        )
+        for claim in claims:
+            evidences = retrieve_evidence(claim, top_k=policy.get("max_evidence_per_claim", 3))
+            feats = _pair_features(claim, evidences, policy.get("embedding_backend"))
+            if not feats:
+                raise RuntimeError("Claim without evidence; cannot sweep")
+
+            claim_idx = len(claim_example)
+            claim_example.append(n_examples)
+            # Absolute / negation flags depend on the claim only
+            absneg.append(feats[0]["has_absolute"] and feats[0]["neg_claim"])
+
+            for f in feats:
+                semantic.append(f["semantic"])
+                lexical.append(f["lexical_overlap"])
+                phrase.append(f["phrase_match"])
+                pair_claim.append(claim_idx)
+
+        n_examples += 1
+
+    return {
+        "semantic": np.asarray(semantic, dtype=np.float64),
+        "lexical": np.asarray(lexical, dtype=np.float64),
+        "phrase": np.asarray(phrase, dtype=bool),
+        "pair_claim": np.asarray(pair_claim, dtype=np.int64),
+        "absneg": np.asarray(absneg, dtype=bool),
+        "claim_example": np.asarray(claim_example, dtype=np.int64),
+        "n_examples": np.asarray(n_examples, dtype=np.int64),
+    }
+
+
+def load_features(path, policy, cache_dir=CACHE_DIR):
+    cache = Path(cache_dir) / f"{Path(path).stem}-{_cache_key(path, policy)}.npz"
+    if cache.exists():
+        with np.load(cache) as data:
+            return {k: data[k] for k in data.files}
+
+    features = extract_features(path, policy)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(cache, **features)
+    return features
+
+
+# --------------------------------------------------
+# Vectorized re-labelling
+# --------------------------------------------------
+def _segment_starts(segment_ids, n_segments):
+    counts = np.bincount(segment_ids, minlength=n_segments)
+    starts = np.zeros(n_segments, dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+    return starts, counts
+
+
+def _prefix_2d(delta, shape):
+    """
+    2-D inclusive prefix sum, cropped to the threshold grid.
+    """
+    return delta.cumsum(axis=0).cumsum(axis=1)[: shape[0], : shape[1]]
+
+
+def sweep(features, semantic_thresholds, lexical_thresholds, on_insufficient="REFUSE"):
+    """
+    Decision rates for every (semantic, lexical) threshold pair.
+
+    A claim is supported at (Ts, Tl) iff max_sem >= Ts or max_lex >= Tl
+    over its evidence, so each claim reduces to one grid point (a, b):
+    it is unsupported exactly on the quadrant i >= a, j >= b. Example
+    outcomes are unions of such quadrants (a staircase), counted with
+    2-D difference arrays: O(claims + grid), not O(pairs x grid).
+
+    Returns a dict of arrays, each of shape (len(semantic), len(lexical)).
+    """
+    ts = np.asarray(semantic_thresholds, dtype=np.float64)
+    tl = np.asarray(lexical_thresholds, dtype=np.float64)
+    ts_order, tl_order = np.argsort(ts, kind="stable"), np.argsort(tl, kind="stable")
+    S, L = ts.size, tl.size
+    shape = (S, L)
+
+    n_examples = int(features["n_examples"])
+    absneg = features["absneg"]
+    n_claims = absneg.size
+    claim_example = features["claim_example"]
+    pair_starts, _ = _segment_starts(features["pair_claim"], n_claims)
+
+    if n_claims:
+        phrase_any = np.logical_or.reduceat(features["phrase"], pair_starts)
+        nonphrase_any = np.logical_or.reduceat(~features["phrase"], pair_starts)
+        max_sem = np.maximum.reduceat(features["semantic"], pair_starts)
+        max_lex = np.maximum.reduceat(features["lexical"], pair_starts)
+    else:
+        phrase_any = nonphrase_any = np.zeros(0, dtype=bool)
+        max_sem = max_lex = np.zeros(0)
+
+    # Threshold-independent claim state
+    refuted = absneg & nonphrase_any
+    # Threshold-dependent claims (absneg & ~refuted implies phrase_any)
+    open_ = ~refuted & ~phrase_any
+
+    claims_per_example = np.bincount(claim_example, minlength=n_examples)
+    rejected = np.bincount(claim_example, weights=refuted, minlength=n_examples) > 0
+
+    # a / b: number of grid thresholds the claim clears (supported for i < a or j < b)
+    a = np.searchsorted(ts[ts_order], max_sem, side="right")
+    b = np.searchsorted(tl[tl_order], max_lex, side="right")
+
+    # Unverified open claims per grid point, split by example rejection
+    def quadrant_count(mask):
+        delta = np.zeros((S + 1, L + 1), dtype=np.int64)
+        np.add.at(delta, (a[mask], b[mask]), 1)
+        return _prefix_2d(delta, shape)
+
+    unverified_open = quadrant_count(open_)
+    unverified_open_kept = quadrant_count(open_ & ~rejected[claim_example])
+
+    # Non-rejected examples with claims: insufficient where any open
+    # claim is unsupported. Staircase per example: sort open claims by
+    # (example, a); running min of b restarted per example.
+    idx = np.flatnonzero(open_ & ~rejected[claim_example])
+    covered = np.zeros(shape, dtype=np.int64)
+    if idx.size:
+        ex, ca, cb = claim_example[idx], a[idx], b[idx]
+        order = np.lexsort((ca, ex))
+        ex, ca, cb = ex[order], ca[order], cb[order]
+
+        # Segmented running min via per-example offsets
+        big = L + 2
+        seg = np.cumsum(np.r_[0, ex[1:] != ex[:-1]])
+        running_min = np.minimum.accumulate(cb - seg * big) + seg * big
+
+        last = np.r_[ex[1:] != ex[:-1], True]
+        next_a = np.where(last, S, np.r_[ca[1:], S])
+
+        delta = np.zeros((S + 1, L + 1), dtype=np.int64)
+        np.add.at(delta, (ca, running_min), 1)
+        np.add.at(delta, (next_a, running_min), -1)
+        covered = _prefix_2d(delta, shape)
+
+    candidates = int(((claims_per_example > 0) & ~rejected).sum())
+    n_rejected = int(rejected.sum())
+    accept = candidates - covered
+    insufficient = n_examples - n_rejected - accept
+
+    counts = {
+        "ACCEPT": accept.astype(np.float64),
+        "REFUSE": np.zeros(shape),
+        "REJECT": np.full(shape, float(n_rejected)),
+    }
+    counts[on_insufficient] = counts.get(on_insufficient, 0) + insufficient
+
+    total_claims = max(int(claims_per_example.sum()), 1)
+    if on_insufficient == "ACCEPT":
+        passed = unverified_open_kept
+    else:
+        # ACCEPT requires every claim VERIFIED
+        passed = np.zeros(shape)
+
+    out = {
+        f"{d.lower()}_rate": counts[d] / max(n_examples, 1)
+        for d in ("ACCEPT", "REFUSE", "REJECT")
+    }
+    out["baseline_hallucination_rate"] = (int(refuted.sum()) + unverified_open) / total_claims
+    out["pass_through_hallucination_rate"] = passed / total_claims
+
+    # Back to the caller's threshold order
+    inv_s, inv_l = np.argsort(ts_order), np.argsort(tl_order)
+    return {k: np.asarray(v, dtype=np.float64)[np.ix_(inv_s, inv_l)] for k, v in out.items()}
+
+
+def sweep_table(features, semantic_thresholds, lexical_thresholds, profile, policy):
+    result = sweep(
+        features,
+        semantic_thresholds,
+        lexical_thresholds,
+        on_insufficient=policy.get("on_insufficient", "REFUSE"),
+    )
+    rows = []
+    for i, s in enumerate(semantic_thresholds):
+        for j, l in enumerate(lexical_thresholds):
+            row = {
+                "profile": profile,
+                "semantic_threshold": round(float(s), 6),
+                "lexical_threshold": round(float(l), 6),
+            }
+            row.update({k: round(float(v[i, j]), 4) for k, v in result.items()})
+            rows.append(row)
+    return rows
+
+
+# --------------------------------------------------
+# Main
+# --------------------------------------------------
+def _grid(spec):
+    """
+    "0.65" -> [0.65]; "0.3:0.9:0.05" -> arange inclusive; "0.5,0.6" -> list
+    """
+    if ":" in spec:
+        lo, hi, step = (float(x) for x in spec.split(":"))
+        return np.round(np.arange(lo, hi + step / 2, step), 6)
+    return np.asarray([float(x) for x in spec.split(",")])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SafeRAG policy-threshold sweep")
+    parser.add_argument(
+        "datasets",
+        nargs="*",
+        default=["eval/datasets/clinical.jsonl", "eval/datasets/finance.jsonl"],
+    )
+    parser.add_argument("--semantic", type=_grid, default=_grid("0.3:0.95:0.05"))
+    parser.add_argument("--lexical", type=_grid, default=_grid("0.1:0.9:0.05"))
+    parser.add_argument("--profiles", default="default", help="comma-separated policy profiles")
+    parser.add_argument("--output", default=None, help="write JSON table")
+    parser.add_argument("--top", type=int, default=10, help="rows to print per dataset/profile")
+    args = parser.parse_args(argv)
+
+    table = []
+    for path in args.datasets:
+        for profile in args.profiles.split(","):
+            policy = load_policy(profile)
+
+            t0 = time.perf_counter()
+            features = load_features(path, policy)
+            t1 = time.perf_counter()
+            rows = sweep_table(features, args.semantic, args.lexical, profile, policy)
+            t2 = time.perf_counter()
+
+            for row in rows:
+                row["dataset"] = path
+            table.extend(rows)
+
+            print(f"=== {Path(path).stem.upper()} / {profile} ===")
+            print(
+                f"  features: {t1 - t0:.3f}s  sweep: {t2 - t1:.3f}s  "
+                f"grid points: {len(rows)}"
+            )
+            # Safest useful settings first: no leaked hallucinations, most ACCEPTs
+            rows.sort(key=lambda r: (r["pass_through_hallucination_rate"], -r["accept_rate"]))
+            for r in rows[: args.top]:
+                print(
+                    f"  sem>={r['semantic_threshold']:<5} lex>={r['lexical_threshold']:<5} "
+                    f"ACCEPT={r['accept_rate']:<6} REFUSE={r['refuse_rate']:<6} "
+                    f"REJECT={r['reject_rate']:<6} pass-through={r['pass_through_hallucination_rate']}"
+                )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(table, indent=2))
+        print("\nTable written to", args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,22 @@
 import multiprocessing as mp
+import os
+import threading
+import warnings
 from pathlib import Path
-from core.retriever import initialize_retriever
+from core.embeddings import set_idf_corpus
+from core.retriever import (
+    EvidenceRetriever,
+    index_id,
+    index_lock,
+    initialize_retriever,
+    read_index_meta,
+    remove_stale_builds,
+)
+
+DEFAULT_CORPUS = "data/documents.txt"
 
 _BOOTSTRAPPED = False
+_LOCK = threading.Lock()
 
 
 def bootstrap():
@@ -14,6 +28,15 @@ def bootstrap():
     - safe to call multiple times
     - REQUIRED before any verification
     """
+    if _BOOTSTRAPPED:
+        return
+
+    # Warmup thread and first requests may race here
+    with _LOCK:
+        _bootstrap()
+
+
+def _bootstrap():
     global _BOOTSTRAPPED
 
     if _BOOTSTRAPPED:
@@ -25,15 +48,136 @@ def bootstrap():
     except RuntimeError:
         pass
 
-    docs_path = Path("data/documents.txt")
-    if not docs_path.exists():
-        raise RuntimeError("Missing data/documents.txt")
+    index_dir = corpus_index_dir()
+    retriever = initialize_retriever(index=_load_or_build_index(None, index_dir).index)
+    # On-disk indexes carry fitted IDF tables (see core.ingest)
+    set_idf_corpus(retriever.documents, index_dir or None, index_id(retriever.index))
+    _BOOTSTRAPPED = True
 
-    documents = [
-        line.strip()
-        for line in docs_path.read_text().splitlines()
-        if line.strip()
-    ]
 
-    initialize_retriever(documents)
-    _BOOTSTRAPPED = True
+def corpus_index_dir():
+    return os.environ.get("SAFERAG_INDEX_DIR", "data/index")
+
+
+def corpus_sources(meta=None):
+    """
+    Corpus files / directories: SAFERAG_CORPUS (os.pathsep separated).
+
+    Unset: the sources recorded in an existing index's meta.json, so an
+    index built with core.ingest stays authoritative; without an index,
+    data/documents.txt.
+    """
+    value = os.environ.get("SAFERAG_CORPUS")
+    if value:
+        return [s for s in value.split(os.pathsep) if s]
+    return recorded_sources(meta) or [DEFAULT_CORPUS]
+
+
+def recorded_sources(meta):
+    """
+    Sources an index was built from ([] for none / in-memory). Indexes
+    ingested before sources were recorded fall back to the fingerprinted
+    files.
+    """
+    if not meta:
+        return []
+    if meta.get("sources"):
+        return list(meta["sources"])
+    fingerprint = meta.get("source_fingerprint") or {}
+    return [s["source"] for s in fingerprint.get("sources", [])]
+
+
+def _require(sources):
+    for source in sources:
+        if not Path(source).exists():
+            raise RuntimeError(f"Missing {source}")
+
+
+def _load_or_build_index(sources, index_dir):
+    """
+    Memory-map the on-disk index, re-ingesting when the sources changed.
+
+    sources: explicit corpus, or None for corpus_sources(): SAFERAG_CORPUS,
+    else the sources the existing index was ingested from (rebuilt with
+    its passage length when they change; used as built, with a warning,
+    when they are gone), else data/documents.txt.
+
+    SAFERAG_INDEX_DIR (default data/index) sets the location; an empty
+    value keeps the index in memory only. SAFERAG_INGEST_WORKERS sets
+    the tokenization processes used for a rebuild.
+
+    Check, rebuild and load run under the directory's index_lock, and
+    meta.json is read only once the lock is held: when several processes
+    start on a cold index, one builds it and the others load the result.
+    """
+    from core.ingest import MAX_PASSAGE_TOKENS, corpus_fingerprint, ingest, iter_passages
+    from core.policy import configured_backends
+
+    if not index_dir:
+        sources = sources or corpus_sources()
+        _require(sources)
+        return EvidenceRetriever(text for _, text, _, _ in iter_passages(sources))
+
+    with index_lock(index_dir):
+        remove_stale_builds(index_dir)
+        meta = read_index_meta(index_dir)
+
+        from_index = sources is None and not os.environ.get("SAFERAG_CORPUS") and bool(recorded_sources(meta))
+        if sources is None:
+            sources = corpus_sources(meta)
+
+        if from_index and not all(Path(s).exists() for s in sources):
+            warnings.warn(
+                f"Sources of the index in {index_dir} are missing; serving it as built",
+                RuntimeWarning,
+            )
+            return EvidenceRetriever.load(index_dir)
+        _require(sources)
+
+        fingerprint = (meta or {}).get("source_fingerprint") or {}
+        max_tokens = fingerprint.get("max_passage_tokens", MAX_PASSAGE_TOKENS)
+        if meta is None or fingerprint != corpus_fingerprint(sources, max_tokens):
+            ingest(
+                sources,
+                index_dir,
+                workers=int(os.environ.get("SAFERAG_INGEST_WORKERS", "1")),
+                max_tokens=max_tokens,
+                embedding_backends=configured_backends(),
+            )
+
+        return EvidenceRetriever.load(index_dir)
+
+
+def warmup():
+    """
+    Bootstrap and load the embedding model ahead of the first request.
+
+    Returns a status dict; never raises (embedding failures are reported,
+    requests then degrade to the lexical tier).
+    """
+    import time
+    from core.policy import configured_backends, load_policy
+    from core.semantic import warmup_model
+
+    t0 = time.perf_counter()
+    bootstrap()
+    t1 = time.perf_counter()
+
+    # Every backend a policy may select, so no profile's first request
+    # pays for a model load or an IDF fit
+    backends, errors = {}, {}
+    for name in configured_backends():
+        try:
+            backends[name] = warmup_model(name)
+        except Exception as e:
+            backends[name], errors[name] = False, str(e)
+
+    default = load_policy("default").get("embedding_backend")
+    return {
+        "bootstrap_s": round(t1 - t0, 3),
+        "model_s": round(time.perf_counter() - t1, 3),
+        "embeddings": backends.get(default, False),
+        "embedding_error": errors.get(default),
+        "backends": backends,
+        "backend_errors": errors,
+    }
@@ -0,0 +1,123 @@
+"""
+SafeRAG Admission Control Tests
+
+Validates:
+- Bounded in-flight and queued work
+- Fast load shedding
+- Deadline-expired requests are dropped
+- FIFO slot hand-over
+- /verify maps rejections to 503 + Retry-After and 504
+"""
+
+import sys
+import asyncio
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+from app.admission import AdmissionController, AdmissionRejected
+
+
+def test_sheds_when_queue_full():
+    async def scenario():
+        ac = AdmissionController(max_in_flight=1, max_queued=1)
+        await ac.acquire()
+        waiter = asyncio.ensure_future(ac.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            await ac.acquire()
+        assert exc.value.reason == "overloaded"
+        assert exc.value.retry_after == 1
+
+        ac.release()
+        await waiter
+        ac.release()
+        return ac.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["admitted"] == 2
+    assert stats["shed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["queued"] == 0
+
+
+def test_expired_deadline_dropped():
+    async def scenario():
+        ac = AdmissionController(max_in_flight=1, max_queued=4)
+        with pytest.raises(AdmissionRejected) as exc:
+            await ac.acquire(deadline=time.time() - 1)
+        assert exc.value.reason == "deadline_exceeded"
+        return ac.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["admitted"] == 0
+    assert stats["expired"] == 1
+
+
+def test_deadline_expires_while_queued():
+    async def scenario():
+        ac = AdmissionController(max_in_flight=1, max_queued=4)
+        await ac.acquire()
+        with pytest.raises(AdmissionRejected):
+            await ac.acquire(deadline=time.time() + 0.02)
+        assert ac.queued == 0
+        ac.release()
+        return ac.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["expired"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_fifo_handover():
+    async def scenario():
+        ac = AdmissionController(max_in_flight=1, max_queued=4)
+        order = []
+
+        async def worker(i):
+            await ac.acquire()
+            order.append(i)
+            await asyncio.sleep(0.001)
+            ac.release()
+
+        await asyncio.gather(*(worker(i) for i in range(4)))
+        return order, ac.stats()
+
+    order, stats = asyncio.run(scenario())
+
+    assert order == [0, 1, 2, 3]
+    assert stats["in_flight"] == 0
+    assert stats["max_wait_ms"] > 0
+
+
+def test_verify_endpoint_status_codes(monkeypatch):
+    import app.api
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+    ac = AdmissionController(max_in_flight=1, max_queued=0)
+    monkeypatch.setattr(app.api, "admission", ac)
+    client = TestClient(app.api.app)
+    body = {"request_id": "admission_api", "generated_text": "Metformin is used for type 2 diabetes."}
+
+    # Occupy the only slot (uncontended acquire does not suspend)
+    asyncio.run(ac.acquire())
+    shed = client.post("/verify", json=body)
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    ac.release()
+
+    late = client.post("/verify", json=body, headers={"X-Request-Deadline": str(time.time() - 1)})
+    assert late.status_code == 504
+
+    ok = client.post("/verify", json=body, headers={"X-Request-Deadline": str(time.time() + 60)})
+    assert ok.status_code == 200
+    assert "X-Queue-Wait-Ms" in ok.headers
+    assert ac.stats()["in_flight"] == 0
@@ -0,0 +1,101 @@
+"""
+SafeRAG Benchmark Harness Tests
+
+Validates:
+- Synthetic data is deterministic and well-formed
+- Baseline comparison flags regressions
+- End-to-end benchmark runs without audit logging
+- Load test stays offline under any policy profile unless --embeddings
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from bench.synthetic import generate_corpus, generate_generation
+from bench.run_bench import compare
+from core.claims import extract_claims
+
+
+def test_corpus_deterministic():
+    assert generate_corpus(50, seed=1) == generate_corpus(50, seed=1)
+    assert generate_corpus(50, seed=1) != generate_corpus(50, seed=2)
+    assert len(generate_corpus(50)) == 50
+
+
+def test_generation_claim_count():
+    for n in (1, 17, 200):
+        claims = extract_claims(generate_generation(n), max_claims=1000)
+        assert len(claims) == n
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}, "c": {"median_ms": 1.0}}
+    current = {"a": {"median_ms": 11.0}, "b": {"median_ms": 15.0}, "d": {"median_ms": 1.0}}
+
+    regressions = compare(current, baseline, tolerance=0.2)
+
+    assert list(regressions) == ["b"]
+    assert regressions["b"]["ratio"] == 1.5
+
+
+def test_find_knee_uses_goodput():
+    from bench.load_test import find_knee
+
+    levels = [
+        {"concurrency": 1, "goodput_rps": 100.0},
+        {"concurrency": 2, "goodput_rps": 190.0},
+        {"concurrency": 4, "goodput_rps": 195.0},
+        {"concurrency": 8, "goodput_rps": 20.0},
+    ]
+
+    assert find_knee(levels) == 2
+
+
+def test_summarise_latency_percentiles():
+    from bench.load_test import summarise
+
+    res = summarise(
+        latencies_ms=list(range(1, 101)),
+        statuses=[200] * 99 + [503],
+        decisions=["ACCEPT"] * 99,
+        elapsed_s=1.0,
+    )
+
+    assert res["p50_ms"] == 50
+    assert res["p99_ms"] == 99
+    assert res["error_rate"] == 0.01
+    assert res["goodput_rps"] == 99.0
+
+
+def test_end_to_end_bench_skips_audit(tmp_path, monkeypatch):
+    import app.audit
+    from bench.run_bench import bench_end_to_end
+
+    monkeypatch.setattr(app.audit, "LOG_PATH", tmp_path / "audit.jsonl")
+
+    results = bench_end_to_end([50], [1, 20], repeat=1)
+
+    # 20 > the default policy's max_claims; bench_end_to_end checks the count
+    assert list(results) == ["run_saferag/passages=50/claims=1", "run_saferag/passages=50/claims=20"]
+    assert not (tmp_path / "audit.jsonl").exists()
+    assert app.audit._ENABLED
+
+
+def test_load_test_policy_profile_stays_offline(tmp_path, monkeypatch):
+    import json
+    import os
+    from bench.load_test import main
+
+    monkeypatch.delenv("SAFERAG_NO_EMBEDDINGS", raising=False)
+    out = tmp_path / "load.json"
+
+    main(["--policy-profile", "default", "--requests", "2", "--concurrency", "1",
+          "--warmup", "0", "--output", str(out)])
+
+    assert os.environ["SAFERAG_NO_EMBEDDINGS"] == "1"
+    report = json.loads(out.read_text())
+    assert report["policy_profile"] == "default"
+    assert report["levels"][0]["error_rate"] == 0
@@ -0,0 +1,76 @@
+"""
+SafeRAG Claim Extraction Tests
+
+Validates:
+- Sentences split into clauses on "and" / "but"; strict vs fallback
+- Claim spans point back into the source text
+- Generator stops early; batch matches per-text extraction
+- Pipeline claim results carry their spans
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from bench.synthetic import long_generation
+from core.claims import extract_claims, extract_claims_batch, iter_claims
+
+
+def test_clauses_and_modes():
+    text = "Metformin is first line and it is cheap. Hello world! Insulin can help, but never alone?"
+
+    assert extract_claims(text) == [
+        "Metformin is first line",
+        "it is cheap",
+        "Insulin can help,",
+        "never alone",
+    ]
+    assert extract_claims(text, max_claims=2) == ["Metformin is first line", "it is cheap"]
+    assert extract_claims("Hello there, world.") == []
+    assert extract_claims("  Hello there, world.  ", mode="fallback") == ["Hello there, world."]
+    assert extract_claims("hi", mode="fallback") == []
+
+
+def test_spans_point_into_text():
+    text = long_generation(10000) + "\n  İstanbul is large and Ankara is the capital.  "
+
+    claims = list(iter_claims(text, mode="fallback"))
+
+    assert len(claims) > 100
+    assert all(text[c["start"]:c["end"]] == c["text"] for c in claims)
+    assert [c["text"] for c in claims] == extract_claims(text, max_claims=None)
+    assert claims[-1]["text"] == "Ankara is the capital"
+
+
+def test_generator_stops_early():
+    claims = iter_claims(long_generation(100000))
+
+    first = next(claims)
+
+    assert first["start"] == 0
+    assert len(list(iter_claims(long_generation(100000), max_claims=3))) == 3
+
+
+def test_batch_matches_single():
+    texts = [long_generation(2000, seed=i) for i in range(5)] + ["", "No claims here."]
+
+    expected = [extract_claims(t, mode="fallback") for t in texts]
+
+    assert extract_claims_batch(texts, mode="fallback") == expected
+    assert extract_claims_batch(texts, mode="fallback", workers=2, chunksize=2) == expected
+
+
+def test_pipeline_reports_spans(monkeypatch):
+    from saferag_bootstrap import bootstrap
+    from app.service import run_saferag
+    from app.schemas import SafeRAGRequest
+
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+    bootstrap()
+    text = "Intro. Zorblax is used to reduce fever and it is safe."
+
+    _, claims, _ = run_saferag(SafeRAGRequest(request_id="claim_spans", generated_text=text))
+
+    assert [text[slice(*c["span"])] for c in claims] == [c["claim"] for c in claims]
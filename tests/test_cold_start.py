@@ -0,0 +1,67 @@
+"""
+SafeRAG Cold Start Tests
+
+Validates:
+- Heavy modules are not imported at module load
+- NumPy cosine similarity
+- Warmup status; every configured backend is warmed
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+import core.semantic
+from core.policy import configured_backends
+from core.semantic import _cosine
+from saferag_bootstrap import warmup
+
+
+def test_service_import_is_light():
+    code = (
+        "import sys, app.service; "
+        "print(','.join(m for m in ('sklearn', 'torch', 'sentence_transformers', 'rank_bm25') "
+        "if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=str(ROOT), capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == ""
+
+
+def test_cosine():
+    assert _cosine([1.0, 0.0], [1.0, 0.0]) == pytest.approx(1.0)
+    assert _cosine([1.0, 0.0], [0.0, 2.0]) == pytest.approx(0.0)
+    assert _cosine([1.0, 1.0], [-1.0, -1.0]) == pytest.approx(-1.0)
+    assert _cosine([0.0, 0.0], [1.0, 0.0]) == 0.0
+
+
+def test_warmup_without_embeddings(monkeypatch):
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+
+    status = warmup()
+
+    assert status["embeddings"] is False
+    assert status["embedding_error"] is None
+
+
+def test_warmup_covers_configured_backends(monkeypatch):
+    warmed = []
+
+    def fake_warmup(backend=None):
+        warmed.append(backend)
+        if backend == "sentence-transformer":
+            raise OSError("model not downloaded")
+        return True
+
+    monkeypatch.setattr(core.semantic, "warmup_model", fake_warmup)
+
+    status = warmup()
+
+    assert warmed == configured_backends() == ["hashed", "sentence-transformer"]
+    assert status["backends"] == {"hashed": True, "sentence-transformer": False}
+    assert status["embedding_error"] == "model not downloaded"
@@ -0,0 +1,133 @@
+"""
+SafeRAG Embedding Backend Tests
+
+Validates:
+- Hashed backend output shape, dtype and normalisation
+- Determinism across processes
+- Continuous semantic signal
+- Per-policy backend selection; incomplete backends fail on creation
+- IDF tables are fitted at index build and loaded, not refitted
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import numpy as np
+import pytest
+import app.service
+import core.embeddings
+from core.embeddings import EmbeddingBackend, HashedNgramBackend, get_backend
+from core.ingest import ingest
+from core.retriever import index_id, load_index
+from core.policy import load_policy
+from core.semantic import semantic_score
+from saferag_bootstrap import bootstrap
+from app.service import run_saferag
+from app.schemas import SafeRAGRequest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_saferag():
+    bootstrap()
+
+
+def test_hashed_encode_shape():
+    backend = HashedNgramBackend(dim=256)
+    mat = backend.encode(["Metformin is first line treatment", "", "Insulin therapy"])
+
+    assert mat.shape == (3, 256)
+    assert mat.dtype == np.float32
+    assert np.linalg.norm(mat[0]) == pytest.approx(1.0, abs=1e-5)
+    assert not mat[1].any()
+
+
+def test_hashed_deterministic_across_processes():
+    code = (
+        "from core.embeddings import HashedNgramBackend; "
+        "print(HashedNgramBackend(dim=64).encode(['Metformin is first line'])[0].tolist())"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(ROOT),
+            env={"PYTHONHASHSEED": seed, "PATH": ""},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def test_hashed_semantic_signal():
+    claim = "Metformin is the first line treatment for type 2 diabetes"
+    close = "Metformin is the recommended first line pharmacological treatment for type 2 diabetes."
+    far = "Stock market returns are volatile and not guaranteed."
+
+    assert semantic_score(claim, close, "hashed") > semantic_score(claim, far, "hashed")
+    # Signed hashing: unrelated texts score near zero (may be slightly negative)
+    assert abs(semantic_score(claim, far, "hashed")) < 0.3
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("does-not-exist")
+
+
+def test_backend_requires_encode():
+    class Incomplete(EmbeddingBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_policy_selects_backend(monkeypatch):
+    monkeypatch.delenv("SAFERAG_NO_EMBEDDINGS", raising=False)
+    monkeypatch.setattr(app.service, "load_policy", lambda profile: load_policy("fast"))
+
+    decision, claims, metrics = run_saferag(SafeRAGRequest(
+        request_id="test_hashed_backend",
+        generated_text="Metformin is the first line treatment for type 2 diabetes.",
+    ))
+
+    assert decision == "ACCEPT"
+    assert claims[0]["tier"] == "full"
+    assert claims[0]["score"] not in {0.75, 0.45, 0.1}
+    assert metrics["degraded_claims"] == 0
+
+
+def test_idf_persisted_with_index(tmp_path, monkeypatch):
+    src = tmp_path / "corpus.txt"
+    src.write_text("Metformin lowers glucose.\nInsulin therapy may be required.\n", encoding="utf-8")
+    ingest([src], tmp_path / "index", embedding_backends=["sentence-transformer", "hashed"])
+
+    index = load_index(tmp_path / "index")
+    expected = HashedNgramBackend().fit_idf(index["documents"])
+    assert len(list((tmp_path / "index").glob("idf_hashed_*.npy"))) == 1
+
+    def no_fit(*args, **kwargs):
+        raise AssertionError("IDF refitted at runtime")
+
+    backend = HashedNgramBackend()
+    monkeypatch.setattr(backend, "fit_idf", no_fit)
+    monkeypatch.setattr(core.embeddings, "_IDF_CORPUS", None)
+    monkeypatch.setattr(core.embeddings, "_IDF_CACHE", (tmp_path / "index", index_id(index)))
+
+    assert np.array_equal(backend._get_idf(), expected)
+
+
+def test_lazy_idf_fit_is_shared(tmp_path, monkeypatch):
+    # Index built before IDF tables were stored: the first fit is saved
+    monkeypatch.setattr(core.embeddings, "_IDF_CORPUS", ["Metformin lowers glucose.", "Insulin."])
+    monkeypatch.setattr(core.embeddings, "_IDF_CACHE", (tmp_path, "abc"))
+
+    fitted = HashedNgramBackend()._get_idf()
+
+    assert len(list(tmp_path.glob("idf_hashed_*_abc.npy"))) == 1
+    assert np.array_equal(HashedNgramBackend()._load_idf(), fitted)
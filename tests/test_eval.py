@@ -0,0 +1,52 @@
+"""
+SafeRAG Evaluation Engine Tests
+
+Validates:
+- Baseline and gated metrics from a single pass
+- Parallel and sequential runs agree
+- A parallel run works on a cold index directory
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from eval.run_eval import evaluate, new_counts, score_example
+
+DATASET = ROOT / "eval" / "datasets" / "clinical.jsonl"
+
+
+def test_score_example_single_pass():
+    counts = new_counts()
+    score_example(counts, "ACCEPT", [{"label": "VERIFIED"}, {"label": "UNSUPPORTED"}])
+    score_example(counts, "REJECT", [{"label": "REFUTED"}])
+
+    assert counts["total_claims"] == 3
+    assert counts["hallucinated_claims"] == 2
+    assert counts["passed_hallucinations"] == 1
+    assert counts["blocked_claims"] == 1
+    assert counts["hard_rejections"] == 1
+    assert counts["decision_counts"] == {"ACCEPT": 1, "REFUSE": 0, "REJECT": 1}
+
+
+def test_parallel_matches_sequential():
+    sequential = evaluate(DATASET, workers=1, batch_size=3)
+    parallel = evaluate(DATASET, workers=2, batch_size=3)
+
+    assert sequential["examples"] == 8
+    for key in ("total_claims", "baseline", "saferag"):
+        assert sequential[key] == parallel[key]
+
+
+def test_parallel_cold_index(monkeypatch, tmp_path):
+    monkeypatch.setenv("SAFERAG_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+
+    report = evaluate(DATASET, workers=4, batch_size=1)
+
+    assert report["examples"] == 8
+    assert report["errors"] == 0
+    assert (tmp_path / "index" / "meta.json").exists()
+    assert not list((tmp_path / "index").glob(".tmp-*"))
@@ -0,0 +1,174 @@
+"""
+SafeRAG Ingestion Tests
+
+Validates:
+- Text / Markdown / JSONL sources skip comments and keep metadata
+- Passages are bounded and ids are stable
+- Streaming index build matches the in-memory index exactly
+- Parallel tokenization preserves order
+- Concurrent cold starts build the index once and clean up crashed builds
+- Bootstrap keeps serving an explicitly ingested index
+"""
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import numpy as np
+import pytest
+from bench.synthetic import generate_corpus, sample_claims
+from core.ingest import chunk_text, ingest, iter_passages, iter_records
+from core.retriever import ARRAYS, EvidenceRetriever, IndexWriter, build_index, load_index
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_text_source_skips_comments(tmp_path):
+    src = _write(tmp_path / "docs.txt", "# HEADER\n\nFirst passage.\n# comment\nSecond passage.\n")
+
+    records = list(iter_records(src))
+
+    assert [r[2] for r in records] == ["First passage.", "Second passage."]
+    assert [r[1] for r in records] == [3, 5]
+
+
+def test_markdown_sections(tmp_path):
+    src = _write(tmp_path / "guide.md", (
+        "# Diabetes\n\nMetformin is first line.\nIt is cheap.\n\n"
+        "<!-- reviewer note -->\n## Hypertension\n\n```\ncode\n```\nACE inhibitors help.\n"
+    ))
+
+    records = list(iter_records(src))
+
+    assert [(r[2], r[3]) for r in records] == [
+        ("Metformin is first line. It is cheap.", {"section": "Diabetes"}),
+        ("ACE inhibitors help.", {"section": "Hypertension"}),
+    ]
+
+
+def test_jsonl_ids_and_metadata(tmp_path):
+    src = _write(tmp_path / "dump.jsonl", "\n".join([
+        json.dumps({"id": "g-1", "text": "Aspirin reduces fever.", "year": 2020, "tags": ["x"]}),
+        json.dumps({"id": "g-2", "text": "  "}),
+    ]))
+
+    passages = list(iter_passages([src]))
+
+    assert len(passages) == 1
+    passage_id, text, freqs, meta = passages[0]
+    assert passage_id == f"{src.as_posix()}:g-1#0"
+    assert freqs == {"aspirin": 1, "reduces": 1, "fever.": 1}
+    assert meta == {"id": "g-1", "year": 2020, "source": src.as_posix(), "record": "g-1", "chunk": 0}
+
+
+def test_chunks_are_bounded():
+    text = "Short one. " + " ".join(["word"] * 25) + ". Tail sentence here."
+
+    chunks = chunk_text(text, max_tokens=10)
+
+    assert all(len(c.split()) <= 10 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+    assert chunks[0] == "Short one."
+
+
+def test_streaming_build_matches_in_memory(tmp_path, monkeypatch):
+    # Tiny spill chunks exercise the chunked counting sort
+    monkeypatch.setattr(IndexWriter, "SPILL_ROWS", 7)
+    docs = generate_corpus(200) + ["aspirin aspirin"] * 3
+
+    writer = IndexWriter(tmp_path / "index")
+    for d in docs:
+        freqs = {}
+        for tok in d.lower().split():
+            freqs[tok] = freqs.get(tok, 0) + 1
+        writer.add(d, freqs)
+    assert writer.close() == len(docs)
+
+    streamed, expected = load_index(tmp_path / "index"), build_index(docs)
+    for name in ARRAYS:
+        assert np.array_equal(streamed[name], expected[name]), name
+    assert list(streamed["vocab"]) == list(expected["vocab"])
+    assert streamed["meta"]["avgdl"] == expected["meta"]["avgdl"]
+
+    loaded, in_memory = EvidenceRetriever.load(tmp_path / "index"), EvidenceRetriever(docs)
+    for claim in sample_claims(10):
+        hits = loaded.retrieve(claim, 5)
+        assert [(h["doc_id"], h["score"]) for h in hits] == \
+            [(h["doc_id"], h["score"]) for h in in_memory.retrieve(claim, 5)]
+        assert all(h["passage_id"] == str(h["doc_id"]) for h in hits)
+
+
+def test_parallel_ingest_matches_serial(tmp_path):
+    src = _write(tmp_path / "corpus.txt", "\n".join(generate_corpus(300)))
+
+    serial = ingest([src], tmp_path / "serial", batch_size=16)
+    parallel = ingest([src], tmp_path / "parallel", workers=2, batch_size=16)
+
+    assert serial["passages"] == parallel["passages"] == 300
+    a, b = load_index(tmp_path / "serial"), load_index(tmp_path / "parallel")
+    assert list(a["passage_ids"]) == list(b["passage_ids"])
+    for name in ARRAYS:
+        assert np.array_equal(a[name], b[name]), name
+
+
+def test_concurrent_cold_start(tmp_path):
+    src = _write(tmp_path / "corpus.txt", "\n".join(generate_corpus(2000)))
+    index_dir = tmp_path / "index"
+    # Left behind by a crashed build (no such process)
+    (index_dir / ".tmp-99999999").mkdir(parents=True)
+
+    script = (
+        "from saferag_bootstrap import _load_or_build_index; "
+        f"print(len(_load_or_build_index([{str(src)!r}], {str(index_dir)!r}).documents))"
+    )
+    env = {**os.environ, "SAFERAG_INGEST_WORKERS": "1"}
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script], cwd=ROOT, env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    results = [p.communicate(timeout=120) for p in procs]
+
+    assert [p.returncode for p in procs] == [0] * 4, [err for _, err in results]
+    assert [out.strip() for out, _ in results] == ["2000"] * 4
+    assert (index_dir / "meta.json").exists()
+    assert not list(index_dir.glob(".tmp-*"))
+
+
+def test_bootstrap_keeps_ingested_index(tmp_path, monkeypatch):
+    from saferag_bootstrap import _load_or_build_index
+
+    monkeypatch.delenv("SAFERAG_CORPUS", raising=False)
+    dump = _write(tmp_path / "dump.txt", "\n".join(generate_corpus(50)))
+    index_dir = tmp_path / "index"
+    ingest([dump], index_dir, max_tokens=8, embedding_backends=())
+
+    loaded = _load_or_build_index(None, index_dir)
+    assert all(pid.startswith(dump.as_posix()) for pid in loaded.passage_ids)
+    n_chunks = len(loaded.documents)
+    assert n_chunks > 50
+
+    # Changed sources are re-ingested with the index's own passage length
+    _write(dump, "\n".join(generate_corpus(60)))
+    rebuilt = _load_or_build_index(None, index_dir)
+    assert all(pid.startswith(dump.as_posix()) for pid in rebuilt.passage_ids)
+    assert max(len(t.split()) for t in rebuilt.documents) <= 8
+
+    # Sources gone: served as built, not replaced by the default corpus
+    dump.unlink()
+    with pytest.warns(RuntimeWarning):
+        kept = _load_or_build_index(None, index_dir)
+    assert len(kept.documents) == len(rebuilt.documents)
+
+    # An explicit SAFERAG_CORPUS still wins
+    other = _write(tmp_path / "other.txt", "Aspirin reduces fever.\n")
+    monkeypatch.setenv("SAFERAG_CORPUS", str(other))
+    assert list(_load_or_build_index(None, index_dir).passage_ids) == [f"{other.as_posix()}:1#0"]
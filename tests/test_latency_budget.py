@@ -0,0 +1,143 @@
+"""
+SafeRAG Latency Budget Tests
+
+Validates:
+- Tier selection under a deadline
+- Degraded verdicts are labelled with their tier
+- Embedding failures degrade explicitly; other errors propagate
+- The first claim is gated by the warmup cost estimate
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+import app.service
+import core.verifier
+from core.semantic import EmbeddingError, expected_pair_cost_ms, warmup_model
+from saferag_bootstrap import bootstrap
+from app.service import run_saferag, select_tier
+from app.schemas import SafeRAGRequest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_saferag():
+    bootstrap()
+
+
+@pytest.fixture
+def fast_embeddings(monkeypatch):
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+
+
+# --------------------------------------------------
+# Tier selection
+# --------------------------------------------------
+
+def test_select_tier():
+    assert select_tier(None, 500.0, 3) == "full"
+    assert select_tier(100.0, None, 3) == "full"
+    assert select_tier(100.0, 50.0, 3) == "full"
+    assert select_tier(100.0, 150.0, 3) == "reduced"
+    assert select_tier(10.0, 150.0, 3) == "lexical"
+    assert select_tier(0.0, None, 3) == "lexical"
+
+
+# --------------------------------------------------
+# Exhausted budget
+# --------------------------------------------------
+
+def test_exhausted_budget_degrades_to_lexical(fast_embeddings):
+    req = SafeRAGRequest(
+        request_id="test_budget_exhausted",
+        generated_text="Metformin is the first line treatment for type 2 diabetes.",
+        latency_budget_ms=0,
+    )
+
+    decision, claims, metrics = run_saferag(req)
+
+    assert decision == "ACCEPT"
+    assert all(c["tier"] == "lexical" for c in claims)
+    assert metrics["degraded_claims"] == len(claims)
+
+
+def test_no_budget_runs_full_tier(fast_embeddings):
+    req = SafeRAGRequest(
+        request_id="test_budget_none",
+        generated_text="Insulin is never used for type 2 diabetes.",
+    )
+
+    decision, claims, metrics = run_saferag(req)
+
+    assert decision == "REJECT"
+    assert all(c["tier"] == "full" for c in claims)
+    assert metrics["degraded_claims"] == 0
+
+
+# --------------------------------------------------
+# Embedding failure
+# --------------------------------------------------
+
+def test_embedding_error_is_reported(monkeypatch):
+    def broken(claim, evidence, backend=None):
+        raise EmbeddingError("model unavailable")
+
+    monkeypatch.setattr(core.verifier, "semantic_score", broken)
+
+    req = SafeRAGRequest(
+        request_id="test_embedding_error",
+        generated_text="Metformin is first line treatment.",
+    )
+
+    decision, claims, metrics = run_saferag(req)
+
+    assert decision == "ACCEPT"
+    assert claims[0]["tier"] == "lexical"
+    assert metrics["degraded_claims"] == 1
+
+
+def test_programming_error_is_not_degraded(monkeypatch):
+    def buggy(claim, evidence, backend=None):
+        raise KeyError("bug")
+
+    monkeypatch.setattr(core.verifier, "semantic_score", buggy)
+
+    req = SafeRAGRequest(
+        request_id="test_programming_error",
+        generated_text="Metformin is first line treatment.",
+    )
+
+    decision, claims, _ = run_saferag(req)
+
+    assert decision == "ERROR"
+    assert claims == []
+
+
+# --------------------------------------------------
+# First-claim cost estimate
+# --------------------------------------------------
+
+def test_first_claim_uses_cost_estimate(fast_embeddings, monkeypatch):
+    # 100 ms per pair: full tier (3 pairs) does not fit 150 ms, reduced does
+    monkeypatch.setattr(app.service, "expected_pair_cost_ms", lambda backend=None: 100.0)
+
+    req = SafeRAGRequest(
+        request_id="test_budget_first_claim",
+        generated_text="Metformin is the first line treatment for type 2 diabetes.",
+        latency_budget_ms=150,
+    )
+
+    _, claims, metrics = run_saferag(req)
+
+    assert claims[0]["tier"] == "reduced"
+    assert metrics["degraded_claims"] == 1
+
+
+def test_warmup_seeds_cost_estimate(monkeypatch):
+    monkeypatch.delenv("SAFERAG_NO_EMBEDDINGS", raising=False)
+
+    assert warmup_model("hashed")
+    assert expected_pair_cost_ms("hashed") > 0
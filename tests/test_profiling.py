@@ -0,0 +1,107 @@
+"""
+SafeRAG Profiling Tests
+
+Validates:
+- Opt-in selection (header / toggle / sampling)
+- Rate limiting
+- Per-request profile files tagged with the audit id
+- Safe profile lookup
+- Admin endpoints disabled unless a token is configured
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+import app.profiling
+from app.profiling import RequestProfiler
+
+
+def work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_opt_in_selection():
+    p = RequestProfiler()
+    assert not p.wants()
+    assert p.wants(requested=True)
+
+    p.enabled = True
+    assert p.wants()
+
+    p = RequestProfiler(sample_rate=1.0)
+    assert p.wants()
+
+
+def test_rate_limited(tmp_path):
+    p = RequestProfiler(max_per_minute=2, output_dir=tmp_path)
+
+    assert p.try_acquire()
+    # One profile at a time
+    assert not p.try_acquire()
+
+    p.run(work, 10, tag="a")
+    assert p.try_acquire()
+    p.run(work, 10, tag="b")
+
+    # Bucket exhausted
+    assert not p.try_acquire()
+    assert p.stats()["throttled"] == 2
+
+
+def test_cprofile_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.profiling, "_sampling_profiler", lambda: None)
+    p = RequestProfiler(output_dir=tmp_path)
+
+    assert p.try_acquire()
+    result, name = p.run(work, 1000, tag="req/../42")
+
+    assert result == work(1000)
+    assert name.endswith("_req_.._42.prof")
+    assert p.resolve(name) == tmp_path / name
+    assert [e["name"] for e in p.list_profiles()] == [name]
+
+
+def test_sampling_output(tmp_path):
+    pytest.importorskip("pyinstrument")
+    p = RequestProfiler(output_dir=tmp_path)
+
+    assert p.try_acquire()
+    _, name = p.run(work, 200000, tag="sampled")
+
+    assert name.endswith("_sampled.collapsed")
+    lines = (tmp_path / name).read_text().splitlines()
+    assert any("work" in l for l in lines)
+
+
+def test_resolve_rejects_traversal(tmp_path):
+    p = RequestProfiler(output_dir=tmp_path)
+    assert p.resolve("../secret.prof") is None
+    assert p.resolve("missing.prof") is None
+    assert p.resolve("notes.txt") is None
+
+
+def test_keeps_newest(tmp_path):
+    p = RequestProfiler(keep=2, max_per_minute=10, output_dir=tmp_path)
+    for i in range(4):
+        assert p.try_acquire()
+        p.run(work, 10, tag=str(i))
+
+    assert len(p.list_profiles()) == 2
+
+
+def test_admin_requires_configured_token(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.api import app as api
+
+    client = TestClient(api)
+    monkeypatch.delenv("SAFERAG_ADMIN_TOKEN", raising=False)
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.post("/admin/profiling", json={"enabled": True}).status_code == 403
+
+    monkeypatch.setenv("SAFERAG_ADMIN_TOKEN", "s3cret")
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "s3cret"}).status_code == 200
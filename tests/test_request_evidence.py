@@ -0,0 +1,115 @@
+"""
+SafeRAG Request Evidence Tests
+
+Validates:
+- Ephemeral index ranks like the corpus index
+- Request-only evidence replaces the global corpus
+- Merge mode fuses request and corpus evidence
+- Claim results report the consulted evidence ids
+- Blank passages are rejected by the schema and skipped by the index
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+from bench.synthetic import generate_corpus, sample_claims
+from core.retriever import EphemeralIndex, EvidenceRetriever, merge_evidence
+from saferag_bootstrap import bootstrap
+from app.service import run_saferag
+from app.schemas import SafeRAGRequest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_saferag():
+    bootstrap()
+
+
+@pytest.fixture(autouse=True)
+def fast_embeddings(monkeypatch):
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+
+
+CONTEXT = [
+    {"id": "ctx-1", "text": "Zorblax is used to reduce fever in adults."},
+    {"id": "ctx-2", "text": "Unrelated passage about the weather today."},
+]
+
+
+def test_ephemeral_index_matches_corpus_index():
+    # Repeated passages push IDF negative and exercise the epsilon floor
+    docs = generate_corpus(20, seed=3) + ["aspirin aspirin"] * 12
+    ephemeral = EphemeralIndex(enumerate(docs))
+    corpus = EvidenceRetriever(docs)
+
+    for claim in sample_claims(30) + ["aspirin"]:
+        assert ephemeral.retrieve(claim, 5) == corpus.retrieve(claim, 5)
+
+
+def test_merge_evidence_interleaves_and_dedupes():
+    a = [{"doc_id": "a1", "text": "x"}, {"doc_id": "a2", "text": "y"}]
+    b = [{"doc_id": "b1", "text": "z"}, {"doc_id": "b2", "text": "x"}]
+
+    merged = merge_evidence([a, b], top_k=3)
+
+    assert [ev["doc_id"] for ev in merged] == ["a1", "b1", "a2"]
+
+
+def test_request_evidence_replaces_corpus():
+    req = SafeRAGRequest(
+        request_id="request_evidence",
+        generated_text="Zorblax is used to reduce fever in adults.",
+        evidence=CONTEXT,
+    )
+
+    decision, claims, _ = run_saferag(req)
+
+    assert decision == "ACCEPT"
+    assert claims[0]["evidence_ids"] == ["ctx-1", "ctx-2"]
+
+
+def test_corpus_evidence_ids_reported():
+    req = SafeRAGRequest(
+        request_id="corpus_evidence_ids",
+        generated_text="Metformin is the first line treatment for type 2 diabetes.",
+    )
+
+    _, claims, _ = run_saferag(req)
+
+    ids = claims[0]["evidence_ids"]
+    assert len(ids) == 3
+    assert all(i.startswith("data/documents.txt:") for i in ids)
+
+
+def test_merge_mode_uses_both_sources():
+    req = SafeRAGRequest(
+        request_id="merged_evidence",
+        generated_text="Zorblax is used to reduce fever in adults.",
+        evidence=CONTEXT,
+        evidence_mode="merge",
+    )
+
+    _, claims, _ = run_saferag(req)
+
+    ids = claims[0]["evidence_ids"]
+    assert ids[0] == "ctx-1"
+    assert any(i.startswith("data/documents.txt:") for i in ids)
+
+
+def test_blank_evidence_is_rejected():
+    from pydantic import ValidationError
+
+    for text in ("", "   \n"):
+        with pytest.raises(ValidationError):
+            SafeRAGRequest(
+                request_id="blank_evidence",
+                generated_text="Zorblax is used to reduce fever in adults.",
+                evidence=[{"id": "blank", "text": text}],
+            )
+
+    index = EphemeralIndex([("blank", "  "), ("ctx-1", CONTEXT[0]["text"])])
+    assert index.ids == ["ctx-1"]
+    assert EphemeralIndex([("blank", "")]).retrieve("Zorblax reduces fever") == []
@@ -0,0 +1,125 @@
+"""
+SafeRAG Retriever Tests
+
+Validates:
+- Document store round-trips text (in memory and memory-mapped)
+- BM25 scores and ranking identical to rank_bm25.BM25Okapi
+- Saved index reloads with identical results
+- MaxScore top-k equals exhaustive scoring and prunes rare-entity claims
+- Claims are NFKC-normalised like ingested passages
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import random
+import pytest
+from bench.synthetic import generate_corpus, rare_entity_claims, sample_claims
+from core.docstore import DocumentStore
+from core.retriever import EphemeralIndex, EvidenceRetriever, tokenize
+
+TEXTS = ["Metformin lowers glucose.", "", "Ünïcödé passage — ok", "last"]
+
+
+def test_docstore_roundtrip(tmp_path):
+    DocumentStore.write(TEXTS, tmp_path / "docs")
+
+    for store in (DocumentStore.from_texts(TEXTS), DocumentStore.open(tmp_path / "docs")):
+        assert len(store) == len(TEXTS)
+        assert list(store) == TEXTS
+        assert store[-1] == "last"
+        assert store[1:3] == TEXTS[1:3]
+        with pytest.raises(IndexError):
+            store[len(TEXTS)]
+
+
+def test_empty_docstore_opens(tmp_path):
+    DocumentStore.write([], tmp_path / "empty")
+    assert len(DocumentStore.open(tmp_path / "empty")) == 0
+
+
+def test_scores_match_bm25okapi(tmp_path):
+    rank_bm25 = pytest.importorskip("rank_bm25")
+
+    # Duplicate passages force score ties
+    docs = generate_corpus(500) + ["aspirin aspirin", "aspirin aspirin", ""]
+    reference = rank_bm25.BM25Okapi([d.lower().split() for d in docs])
+
+    retriever = EvidenceRetriever(docs)
+    retriever.save(tmp_path / "index")
+    loaded = EvidenceRetriever.load(tmp_path / "index")
+
+    for claim in sample_claims(40) + ["aspirin aspirin", "unknownterm"]:
+        scores = reference.get_scores(claim.lower().split())
+        expected = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)[:5]
+
+        for r in (retriever, loaded):
+            assert (r.get_scores(claim.lower().split()) == scores).all()
+            hits = r.retrieve(claim, top_k=5)
+            assert [h["doc_id"] for h in hits] == expected
+            assert [h["text"] for h in hits] == [docs[i] for i in expected]
+            assert [h["score"] for h in hits] == [round(float(scores[i]), 3) for i in expected]
+
+
+def test_top_k_larger_than_corpus():
+    retriever = EvidenceRetriever(["a b", "b c", "a d"])
+    assert [h["doc_id"] for h in retriever.retrieve("c", top_k=10)] == [1, 0, 2]
+    assert EvidenceRetriever([]).retrieve("c") == []
+
+
+def test_maxscore_matches_exhaustive():
+    rng = random.Random(0)
+    entity_passages, entity_claims = rare_entity_claims(20)
+    # Duplicates force ties; "x y" pairs give zero-IDF terms
+    docs = generate_corpus(1000) + entity_passages + ["x y", "x y", "aspirin aspirin"]
+    retriever = EvidenceRetriever(docs)
+    vocab = list(retriever._vocab)
+
+    queries = entity_claims + sample_claims(30) + ["aspirin", "nothing matches", "the the"]
+    queries += [" ".join(rng.sample(vocab, rng.randint(1, 5))) for _ in range(100)]
+
+    for claim in queries:
+        for k in (1, 3, 10, len(docs) + 1):
+            assert retriever.retrieve(claim, k) == retriever.retrieve(claim, k, exhaustive=True)
+
+
+def test_maxscore_prunes_rare_entity_claims():
+    entity_passages, entity_claims = rare_entity_claims(5, copies=3)
+    retriever = EvidenceRetriever(generate_corpus(2000) + entity_passages)
+
+    for claim in entity_claims:
+        terms = [retriever._term_id(t) for t in tokenize(claim)]
+        candidates, _ = retriever._maxscore_top_k([t for t in terms if t is not None], 3)
+        # Only the entity's passages are scored, not every "is"/"for" posting
+        assert len(candidates) <= 3
+
+
+def test_index_without_bounds_loads(tmp_path):
+    docs = generate_corpus(100)
+    EvidenceRetriever(docs).save(tmp_path / "index")
+    (tmp_path / "index" / "term_max.npy").unlink()
+
+    loaded = EvidenceRetriever.load(tmp_path / "index")
+
+    assert (loaded.index["term_max"] == EvidenceRetriever(docs).index["term_max"]).all()
+
+
+def test_claims_normalised_like_passages(tmp_path):
+    from core.ingest import ingest
+
+    src = tmp_path / "docs.txt"
+    src.write_text("Aspirin is the ﬁrst choice for ＦＥＶＥＲ.\nInsulin lowers glucose.\nStatins lower cholesterol.\n", encoding="utf-8")
+    ingest([src], tmp_path / "index")
+    retriever = EvidenceRetriever.load(tmp_path / "index")
+
+    assert tokenize("ﬁrst ＦＥＶＥＲ.") == ["first", "fever."]
+    for claim in ("ﬁrst ＦＥＶＥＲ.", "first fever."):
+        hits = retriever.retrieve(claim, top_k=1)
+        assert hits[0]["text"] == "Aspirin is the first choice for FEVER."
+        assert hits[0]["score"] > 0
+
+    ephemeral = EphemeralIndex([("a", "the ﬁrst choice"), ("b", "insulin"), ("c", "statins")])
+    assert ephemeral.retrieve("first choice", top_k=1)[0]["doc_id"] == "a"
@@ -0,0 +1,136 @@
+"""
+SafeRAG Rolling Statistics Tests
+
+Validates:
+- Fixed-bin sketch quantiles within one bin of the exact values
+- Sliding window expires old buckets; lifetime keeps everything
+- Degraded (lexical-tier) claims add no semantic-score samples
+- Series are capped (overflow series) and updates are thread-safe
+- The pipeline records decisions and labels per profile and domain
+"""
+
+import sys
+import random
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+from core.stats import OVERFLOW_KEY, FixedBinSketch, RollingStats
+
+
+def _claims(*labels, semantic=0.5, lexical=0.25):
+    return [{"label": l, "semantic_score": semantic, "lexical_overlap": lexical} for l in labels]
+
+
+def test_sketch_quantiles():
+    rng = random.Random(0)
+    values = [rng.betavariate(2, 5) for _ in range(10000)]
+    sketch = FixedBinSketch(0.0, 1.0, 100)
+    for v in values:
+        sketch.add(v)
+
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        assert abs(sketch.quantile(q) - values[int(q * len(values))]) <= 0.01
+    assert sketch.quantile(0.0) >= values[0]
+    assert sketch.quantile(1.0) == values[-1]
+    assert FixedBinSketch().summary() == {"count": 0}
+
+
+def test_window_expires_lifetime_keeps():
+    stats = RollingStats(window_s=60, n_buckets=6)
+
+    stats.record("ACCEPT", _claims("VERIFIED"), now=0)
+    stats.record("REJECT", _claims("REFUTED", "VERIFIED"), now=30)
+    stats.record("REFUSE", _claims("UNSUPPORTED"), now=65)
+
+    snap = stats.snapshot(now=65)
+    window, lifetime = snap["total"]["window"], snap["total"]["lifetime"]
+
+    assert window["decisions"] == {"REFUSE": 1, "REJECT": 1}
+    assert window["hallucination_rate"] == pytest.approx(2 / 3, abs=1e-4)
+    assert lifetime["requests"] == 3
+    assert lifetime["labels"] == {"REFUTED": 1, "UNSUPPORTED": 1, "VERIFIED": 2}
+    assert lifetime["decision_rates"]["ACCEPT"] == pytest.approx(1 / 3, abs=1e-4)
+    assert lifetime["semantic_score"]["p50"] == 0.5
+    assert lifetime["lexical_overlap"]["count"] == 4
+
+    assert stats.snapshot(now=1000)["total"]["window"]["requests"] == 0
+
+
+def test_lexical_tier_skips_semantic_sample():
+    stats = RollingStats()
+    claims = _claims("VERIFIED", semantic=0.9) + [
+        {"label": "UNSUPPORTED", "semantic_score": 0.0, "lexical_overlap": 0.1, "tier": "lexical"},
+    ]
+
+    stats.record("REFUSE", claims, now=0)
+    lifetime = stats.snapshot(now=0)["total"]["lifetime"]
+
+    assert lifetime["claims"] == 2
+    assert lifetime["semantic_score"]["count"] == 1
+    assert lifetime["semantic_score"]["p50"] == 0.9
+    assert lifetime["lexical_overlap"]["count"] == 2
+
+
+def test_series_filter_and_cap():
+    stats = RollingStats(max_series=2)
+
+    stats.record("ACCEPT", profile="default", domain="medical", now=0)
+    stats.record("ACCEPT", profile="fast", domain="finance", now=0)
+    stats.record("REFUSE", profile="fast", domain="legal", now=0)
+
+    snap = stats.snapshot(now=0)
+    keys = [(s["profile"], s["domain"]) for s in snap["series"]]
+
+    assert keys == [OVERFLOW_KEY, ("default", "medical"), ("fast", "finance")]
+    assert snap["total"]["lifetime"]["requests"] == 3
+    assert [s["domain"] for s in stats.snapshot(profile="fast", now=0)["series"]] == ["finance"]
+
+
+def test_concurrent_updates():
+    stats = RollingStats(window_s=10, n_buckets=10)
+
+    def worker(i):
+        for n in range(500):
+            stats.record("ACCEPT", _claims("VERIFIED"), domain=f"d{i % 2}", now=n / 100)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    total = stats.snapshot(now=4.99)["total"]
+    assert total["lifetime"]["requests"] == total["window"]["requests"] == 4000
+    assert total["lifetime"]["semantic_score"]["count"] == 4000
+
+
+def test_pipeline_records_stats(monkeypatch):
+    import app.service
+    from saferag_bootstrap import bootstrap
+    from app.service import run_saferag
+    from app.schemas import SafeRAGRequest
+
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+    monkeypatch.setattr(app.service, "quality_stats", RollingStats())
+    bootstrap()
+
+    run_saferag(SafeRAGRequest(
+        request_id="stats_1",
+        generated_text="Metformin is the first line treatment for type 2 diabetes.",
+        domain="medical",
+    ))
+    run_saferag(SafeRAGRequest(request_id="stats_2", generated_text="Hello.", domain="medical"))
+
+    series = app.service.quality_stats.snapshot()["series"]
+
+    assert [(s["profile"], s["domain"]) for s in series] == [("default", "medical")]
+    lifetime = series[0]["lifetime"]
+    assert lifetime["requests"] == 2
+    assert lifetime["claims"] == 1
+    assert lifetime["decisions"]["REFUSE"] == 1
+    assert lifetime["semantic_score"]["count"] == 1
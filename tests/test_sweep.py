@@ -0,0 +1,174 @@
+"""
+SafeRAG Threshold Sweep Tests
+
+Validates:
+- Vectorized re-labelling matches the real pipeline at every grid point
+- Feature cache round-trips; its key follows every corpus source
+- Embedding failures abort the sweep instead of caching lexical features
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+import app.service
+from core.policy import DEFAULT_POLICY
+from eval.run_eval import evaluate
+from eval.sweep import _cache_key, load_features, sweep
+
+DATASET = ROOT / "eval" / "datasets" / "clinical.jsonl"
+
+
+@pytest.fixture
+def fast_embeddings(monkeypatch):
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+
+
+@pytest.mark.parametrize("semantic,lexical", [(0.65, 0.35), (0.4, 0.9), (0.8, 0.2), (1.1, 1.1)])
+def test_sweep_matches_pipeline(fast_embeddings, monkeypatch, tmp_path, semantic, lexical):
+    policy = {**DEFAULT_POLICY, "semantic_threshold": semantic, "lexical_threshold": lexical}
+    monkeypatch.setattr(app.service, "load_policy", lambda profile: policy)
+
+    report = evaluate(DATASET, workers=1)
+    features = load_features(DATASET, DEFAULT_POLICY, cache_dir=tmp_path)
+    swept = sweep(features, [semantic], [lexical])
+
+    n = report["examples"]
+    counts = report["saferag"]["decision_counts"]
+    assert swept["accept_rate"][0, 0] == pytest.approx(counts["ACCEPT"] / n)
+    assert swept["refuse_rate"][0, 0] == pytest.approx(counts["REFUSE"] / n)
+    assert swept["reject_rate"][0, 0] == pytest.approx(counts["REJECT"] / n)
+    assert swept["baseline_hallucination_rate"][0, 0] == pytest.approx(
+        report["baseline"]["hallucinated_claims"] / report["total_claims"]
+    )
+
+
+def test_feature_cache(fast_embeddings, tmp_path):
+    first = load_features(DATASET, DEFAULT_POLICY, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    second = load_features(DATASET, DEFAULT_POLICY, cache_dir=tmp_path)
+    for k in first:
+        assert (first[k] == second[k]).all()
+
+
+def test_cache_key_tracks_corpus(monkeypatch, tmp_path):
+    extra = tmp_path / "extra.txt"
+    extra.write_text("Zorblax is used to reduce fever.\n")
+    default = _cache_key(DATASET, DEFAULT_POLICY)
+
+    monkeypatch.setenv("SAFERAG_CORPUS", f"data/documents.txt{os.pathsep}{extra}")
+    with_extra = _cache_key(DATASET, DEFAULT_POLICY)
+    extra.write_text("Zorblax is used to reduce fever in adults.\n")
+
+    assert with_extra != default
+    assert _cache_key(DATASET, DEFAULT_POLICY) != with_extra
+
+
+def test_embedding_failure_aborts(monkeypatch, tmp_path):
+    import core.verifier
+    from core.semantic import EmbeddingError
+
+    def broken(claim, evidence, backend=None):
+        raise EmbeddingError("model unavailable")
+
+    monkeypatch.setattr(core.verifier, "semantic_score", broken)
+
+    with pytest.raises(RuntimeError, match="cannot sweep"):
+        load_features(DATASET, DEFAULT_POLICY, cache_dir=tmp_path)
+    assert not list(tmp_path.glob("*.npz"))
+
+
+def test_on_insufficient_accept_leaks(fast_embeddings, tmp_path):
+    features = load_features(DATASET, DEFAULT_POLICY, cache_dir=tmp_path)
+    swept = sweep(features, [0.65], [0.35], on_insufficient="ACCEPT")
+
+    assert swept["refuse_rate"][0, 0] == 0
+    assert swept["pass_through_hallucination_rate"][0, 0] > 0
+
+
+def _naive(features, ts, tl, on_insufficient):
+    # Direct per-grid-point re-labelling, mirroring label_from_features
+    n_examples = int(features["n_examples"])
+    rates = {"ACCEPT": 0, "REFUSE": 0, "REJECT": 0}
+    claims = {}
+    for p, c in enumerate(features["pair_claim"]):
+        claims.setdefault(c, []).append(p)
+
+    passed = unverified = total = 0
+    for e in range(n_examples):
+        labels = []
+        for c in [c for c in range(features["absneg"].size) if features["claim_example"][c] == e]:
+            pair_labels = []
+            for p in claims[c]:
+                if features["phrase"][p]:
+                    pair_labels.append("VERIFIED")
+                elif features["absneg"][c]:
+                    pair_labels.append("REFUTED")
+                elif features["semantic"][p] >= ts or features["lexical"][p] >= tl:
+                    pair_labels.append("VERIFIED")
+                else:
+                    pair_labels.append("UNSUPPORTED")
+            if "REFUTED" in pair_labels:
+                labels.append("REFUTED")
+            elif "VERIFIED" in pair_labels:
+                labels.append("VERIFIED")
+            else:
+                labels.append("UNSUPPORTED")
+
+        if "REFUTED" in labels:
+            decision = "REJECT"
+        elif labels and all(l == "VERIFIED" for l in labels):
+            decision = "ACCEPT"
+        else:
+            decision = on_insufficient
+        rates[decision] += 1
+        total += len(labels)
+        bad = sum(l != "VERIFIED" for l in labels)
+        unverified += bad
+        if decision == "ACCEPT":
+            passed += bad
+
+    return {
+        "accept_rate": rates["ACCEPT"] / n_examples,
+        "refuse_rate": rates["REFUSE"] / n_examples,
+        "reject_rate": rates["REJECT"] / n_examples,
+        "baseline_hallucination_rate": unverified / max(total, 1),
+        "pass_through_hallucination_rate": passed / max(total, 1),
+    }
+
+
+@pytest.mark.parametrize("on_insufficient", ["REFUSE", "ACCEPT"])
+def test_sweep_matches_naive(on_insufficient):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    claims_per_example = rng.integers(0, 4, size=40)
+    claim_example = np.repeat(np.arange(40), claims_per_example)
+    n_claims = claim_example.size
+    pairs_per_claim = rng.integers(1, 4, size=n_claims)
+    n_pairs = int(pairs_per_claim.sum())
+
+    features = {
+        "semantic": np.round(rng.random(n_pairs), 2),
+        "lexical": np.round(rng.random(n_pairs), 2),
+        "phrase": rng.random(n_pairs) < 0.1,
+        "pair_claim": np.repeat(np.arange(n_claims), pairs_per_claim),
+        "absneg": rng.random(n_claims) < 0.1,
+        "claim_example": claim_example,
+        "n_examples": np.asarray(40),
+    }
+    ts = [0.9, 0.1, 0.5, 0.65, 0.3]
+    tl = [0.35, 0.0, 0.8, 0.5]
+
+    swept = sweep(features, ts, tl, on_insufficient=on_insufficient)
+
+    for i, s in enumerate(ts):
+        for j, l in enumerate(tl):
+            expected = _naive(features, s, l, on_insufficient)
+            for k, v in expected.items():
+                assert swept[k][i, j] == pytest.approx(v), (k, s, l)
@@ -0,0 +1,104 @@
+"""
+SafeRAG Telemetry Tests
+
+Validates:
+- Prometheus text exposition
+- Per-stage timing spans in the pipeline
+- Optional stage timings in audit events
+"""
+
+import sys
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import pytest
+import app.service
+from core import telemetry
+from core.policy import DEFAULT_POLICY
+from saferag_bootstrap import bootstrap
+from app.service import run_saferag
+from app.schemas import SafeRAGRequest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_saferag():
+    bootstrap()
+
+
+# --------------------------------------------------
+# Exposition
+# --------------------------------------------------
+
+def test_histogram_render():
+    registry = []
+    h = telemetry.Histogram(
+        "test_latency_ms", "Test.", (1, 10), labelnames=("stage",), registry=registry
+    )
+    h.observe(0.5, stage="a")
+    h.observe(5, stage="a")
+    h.observe(50, stage="a")
+
+    lines = h.render()
+
+    assert 'test_latency_ms_bucket{stage="a",le="1"} 1' in lines
+    assert 'test_latency_ms_bucket{stage="a",le="10"} 2' in lines
+    assert 'test_latency_ms_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_latency_ms_count{stage="a"} 3' in lines
+    assert "# TYPE test_latency_ms histogram" in telemetry.render_prometheus(registry)
+    # Local registry: never exported with the process-wide metrics
+    assert "test_latency_ms" not in telemetry.render_prometheus()
+
+
+def test_counter_requires_labels():
+    with pytest.raises(ValueError):
+        telemetry.DECISIONS.inc()
+
+
+# --------------------------------------------------
+# Pipeline instrumentation
+# --------------------------------------------------
+
+def test_stages_timed(monkeypatch):
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+    before = telemetry.DECISIONS.value(decision="ACCEPT")
+
+    run_saferag(SafeRAGRequest(
+        request_id="test_telemetry",
+        generated_text="Metformin is first line treatment.",
+    ))
+
+    for stage in (
+        "extract_claims",
+        "retrieve_evidence",
+        "semantic_score",
+        "cluster_claims",
+        "log_audit_event",
+        "total",
+    ):
+        assert telemetry.STAGE_LATENCY.count(stage=stage) > 0
+
+    assert telemetry.DECISIONS.value(decision="ACCEPT") == before + 1
+    assert "saferag_stage_latency_ms_bucket" in telemetry.render_prometheus()
+
+
+def test_stage_timings_in_audit(monkeypatch):
+    monkeypatch.setenv("SAFERAG_NO_EMBEDDINGS", "1")
+    monkeypatch.setattr(
+        app.service,
+        "load_policy",
+        lambda profile: {**DEFAULT_POLICY, "audit_stage_timings": True},
+    )
+
+    run_saferag(SafeRAGRequest(
+        request_id="test_stage_timings",
+        generated_text="Metformin is first line treatment.",
+    ))
+
+    with open("logs/saferag_audit.jsonl") as f:
+        events = [json.loads(l) for l in f if "test_stage_timings" in l]
+
+    timings = events[-1]["stage_timings_ms"]
+    assert {"extract_claims", "retrieve_evidence", "cluster_claims"} <= set(timings)